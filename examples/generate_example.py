@@ -1,7 +1,10 @@
 """Generate an example .pfm file to see what the format looks like."""
 
 import sys
-sys.path.insert(0, str(__import__("pathlib").Path(__file__).parent.parent))
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
 
 from pfm.document import PFMDocument
 
@@ -46,7 +49,7 @@ files_read: 12
 lines_analyzed: 3400""")
 
 # Write the example
-output = str(__import__("pathlib").Path(__file__).parent / "hello.pfm")
+output = str(HERE / "hello.pfm")
 nbytes = doc.write(output)
 print(f"Generated {output} ({nbytes} bytes)")
 
@@ -56,4 +59,8 @@ print("=" * 60)
 print("RAW .pfm FILE CONTENTS:")
 print("=" * 60)
 print()
-print(doc.to_bytes().decode("utf-8"))
+sys.stdout.flush()
+# Write the serialized bytes straight to stdout (no decode/re-encode round-trip)
+sys.stdout.buffer.write(doc.to_bytes())
+sys.stdout.buffer.write(b"\n")
+sys.stdout.flush()
@@ -9,7 +9,37 @@ __version__ = "0.2.0"
 __format_version__ = "1.0"
 
 from pfm.spec import MAGIC, FORMAT_VERSION, SECTION_TYPES
-from pfm.writer import PFMWriter
-from pfm.reader import PFMReader
-from pfm.document import PFMDocument
-from pfm.stream import PFMStreamWriter
+
+# Public classes are imported on first attribute access (PEP 562), so
+# `import pfm` — and every CLI invocation — only pays for what it uses.
+_LAZY = {
+    "PFMWriter": "pfm.writer",
+    "PFMReader": "pfm.reader",
+    "PFMDocument": "pfm.document",
+    "PFMStreamWriter": "pfm.stream",
+}
+
+__all__ = [
+    "MAGIC",
+    "FORMAT_VERSION",
+    "SECTION_TYPES",
+    "PFMWriter",
+    "PFMReader",
+    "PFMDocument",
+    "PFMStreamWriter",
+]
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module 'pfm' has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value  # cache: later lookups bypass __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
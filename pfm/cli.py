@@ -19,10 +19,44 @@ Commands:
 
 from __future__ import annotations
 
-import argparse
+import functools
 import os
+import re
 import sys
-from pathlib import Path
+from typing import TYPE_CHECKING, Callable, NoReturn
+
+from pfm.spec import MAGIC
+
+if TYPE_CHECKING:
+    # argparse is imported lazily in _get_parser(): the --version, bare and
+    # `identify <file>` fast paths never need it.
+    import argparse
+
+    from pfm.document import PFMDocument
+
+_MAGIC_BYTES = MAGIC.encode("utf-8")
+
+# `pfm inspect` cuts meta values longer than this, ending them with "..."
+_INSPECT_VALUE_WIDTH = 72
+
+
+def _die(msg: str) -> NoReturn:
+    """Exit with status 1, printing ``Error: <msg>`` to stderr."""
+    raise SystemExit(f"Error: {msg}")
+
+
+# A '..' path component, with either separator style
+_TRAVERSAL_RE = re.compile(r"(?:^|[\\/])\.\.(?:[\\/]|$)")
+
+
+def _safe_out(path: str, what: str = "Output path") -> str:
+    """Return ``path``, exiting with an error if it has a '..' component.
+
+    One regex scan over the string; no ``Path`` is constructed.
+    """
+    if _TRAVERSAL_RE.search(path):
+        _die(f"{what} must not contain '..' (path traversal)")
+    return path
 
 
 def cmd_create(args: argparse.Namespace) -> None:
@@ -36,88 +70,99 @@ def cmd_create(args: argparse.Namespace) -> None:
 
     # Read content from stdin or --content flag
     if args.content:
-        content = args.content
+        doc.add_section("content", args.content)
     elif args.file:
-        # PFM-005/CLI: Resolve path and reject traversal attempts
-        file_path = Path(args.file).resolve()
-        cwd = Path.cwd().resolve()
-        if ".." in Path(args.file).parts:
-            print("Error: Path traversal (..) not allowed in --file", file=sys.stderr)
-            sys.exit(1)
-        # Ensure resolved path is under the current working directory
+        # PFM-005/CLI: Reject traversal attempts. The textual '..' check is
+        # cheap; realpath then catches absolute paths and symlinks that
+        # lead outside the current directory.
+        _safe_out(args.file, "--file")
+        real_path = os.path.realpath(args.file)
+        cwd = os.path.realpath(os.getcwd())
         try:
-            file_path.relative_to(cwd)
-        except ValueError:
-            print("Error: --file must reference a path under the current directory", file=sys.stderr)
-            sys.exit(1)
-        if not file_path.is_file():
-            print(f"Error: File not found: {args.file}", file=sys.stderr)
-            sys.exit(1)
-        content = file_path.read_text(encoding="utf-8")
+            inside = os.path.commonpath([real_path, cwd]) == cwd
+        except ValueError:  # different drives on Windows
+            inside = False
+        if not inside:
+            _die("--file must reference a path under the current directory")
+        # Opening the file is the existence check; no separate stat
+        try:
+            doc.add_section_from_file("content", real_path)
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            _die(f"File not found: {args.file}")
+        except UnicodeDecodeError:
+            _die(f"--file content is not valid UTF-8: {args.file}")
     elif not sys.stdin.isatty():
-        content = sys.stdin.read()
+        # Raw bytes: decoded once by add_section and reused when writing
+        try:
+            doc.add_section("content", sys.stdin.buffer.read())
+        except UnicodeDecodeError:
+            _die("stdin content is not valid UTF-8")
     else:
-        print("Error: Provide content via --content, --file, or stdin", file=sys.stderr)
-        sys.exit(1)
-
-    doc.add_section("content", content)
+        _die("Provide content via --content, --file, or stdin")
 
     if args.chain:
         doc.add_section("chain", args.chain)
 
-    output = args.output or "output.pfm"
-    nbytes = doc.write(output)
-    print(f"Created {output} ({nbytes} bytes)")
+    output = _safe_out(args.output or "output.pfm")
 
-    # Optional signing (--sign or PFM_ALWAYS_SIGN env var)
+    # Optional signing (--sign or PFM_SIGN_SECRET env var).
+    # Sign and encrypt the in-memory document, then write exactly once —
+    # the plaintext never touches disk when encryption is requested.
     sign_secret = getattr(args, 'sign', None) or os.environ.get('PFM_SIGN_SECRET', '')
     if sign_secret:
-        from pfm.security import sign_document
-        from pfm.reader import PFMReader
-        doc = PFMReader.read(output)
-        sign_document(doc, sign_secret)
-        doc.write(output)
-        print(f"  Signed with HMAC-SHA256")
+        from pfm.security import sign
+        # The signature covers meta, so fill in the checksum the writer
+        # would otherwise only compute at serialization time.
+        doc.checksum = doc.compute_checksum()
+        sign(doc, sign_secret)
 
-    # Optional encryption (--encrypt or PFM_ALWAYS_ENCRYPT env var)
+    # Optional encryption (--encrypt or PFM_ENCRYPT_PASSWORD env var)
     encrypt_pw = getattr(args, 'encrypt', None) or os.environ.get('PFM_ENCRYPT_PASSWORD', '')
     if encrypt_pw:
         from pfm.security import encrypt_document
-        from pfm.reader import PFMReader
-        doc = PFMReader.read(output)
+        from pfm.writer import atomic_write
         encrypted = encrypt_document(doc, encrypt_pw)
         enc_output = output + ".enc"
-        Path(enc_output).write_bytes(encrypted)
-        Path(output).unlink()
-        print(f"  Encrypted -> {enc_output}")
+        atomic_write(enc_output, encrypted, mode=0o644)
+        print(f"Created {enc_output} ({len(encrypted)} bytes)")
+    else:
+        nbytes = doc.write(output)
+        print(f"Created {output} ({nbytes} bytes)")
+
+    if sign_secret:
+        print(f"  Signed with HMAC-SHA256")
+    if encrypt_pw:
+        print(f"  Encrypted with AES-256-GCM")
 
 
 def cmd_inspect(args: argparse.Namespace) -> None:
     """Inspect a .pfm file - show metadata and section listing."""
     from pfm.reader import PFMReader
 
+    # Build the report and write it once rather than one print() per line
     with PFMReader.open(args.path) as reader:
-        print(f"PFM v{reader.format_version}")
-        print()
-
-        print("META:")
+        out = [f"PFM v{reader.format_version}\n\nMETA:\n"]
+        append = out.append
+        width = _INSPECT_VALUE_WIDTH
         for key, val in reader.meta.items():
             # Truncate long values
-            display = val if len(val) <= 72 else val[:69] + "..."
-            print(f"  {key}: {display}")
-        print()
+            if len(val) <= width:
+                append(f"  {key}: {val}\n")
+            else:
+                append(f"  {key}: {val[:width - 3]}...\n")
 
-        print("SECTIONS:")
-        for name in reader.section_names:
-            entries = reader.index.get_all(name)
+        append("\nSECTIONS:\n")
+        # Walk the index directly (same order as section_names) instead of
+        # a get_all() lookup per name
+        for name, entries in reader.index.entries.items():
             for offset, length in entries:
-                print(f"  {name:16s}  offset={offset:>8d}  length={length:>8d}")
-        print()
+                append(f"  {name:16s}  offset={offset:>8d}  length={length:>8d}\n")
 
         # Checksum validation
         valid = reader.validate_checksum()
         status = "VALID" if valid else "INVALID"
-        print(f"CHECKSUM: {status}")
+        append(f"\nCHECKSUM: {status}\n")
+    sys.stdout.write("".join(out))
 
 
 def cmd_read(args: argparse.Namespace) -> None:
@@ -125,34 +170,32 @@ def cmd_read(args: argparse.Namespace) -> None:
     from pfm.reader import PFMReader
 
     with PFMReader.open(args.path) as reader:
-        content = reader.get_section(args.section)
+        content = reader.get_section_bytes(args.section)
         if content is None:
             print(f"Section '{args.section}' not found.", file=sys.stderr)
             print(f"Available: {', '.join(reader.section_names)}", file=sys.stderr)
             sys.exit(1)
-        print(content, end="")
+    sys.stdout.buffer.write(content)
 
 
 def cmd_validate(args: argparse.Namespace) -> None:
     """Validate a .pfm file."""
-    from pfm.reader import PFMReader
+    from pfm.reader import PFMReader, BadMagicError
 
     path = args.path
 
-    # Quick magic byte check
-    if not PFMReader.is_pfm(path):
-        print(f"FAIL: {path} is not a valid PFM file (bad magic bytes)")
-        sys.exit(1)
-
     try:
-        with PFMReader.open(path) as reader:
-            valid = reader.validate_checksum()
+        reader, valid = PFMReader.open_and_validate(path)
+        with reader:
             if valid:
                 print(f"OK: {path} is valid PFM v{reader.format_version}")
                 print(f"    Sections: {', '.join(reader.section_names)}")
             else:
                 print(f"FAIL: {path} checksum mismatch")
                 sys.exit(1)
+    except BadMagicError:
+        print(f"FAIL: {path} is not a valid PFM file (bad magic bytes)")
+        sys.exit(1)
     except ValueError as e:
         # ValueError from parser (version, format, bounds) -- safe to show
         print(f"FAIL: parse error: {e}")
@@ -163,17 +206,20 @@ def cmd_validate(args: argparse.Namespace) -> None:
         sys.exit(1)
 
 
+_EXT_FORMATS = {".json": "json", ".csv": "csv", ".txt": "txt", ".md": "md", ".markdown": "md", ".pfm": "pfm"}
+
+
 def _infer_format(filename: str) -> str | None:
     """Infer format from file extension."""
-    ext_map = {".json": "json", ".csv": "csv", ".txt": "txt", ".md": "md", ".markdown": "md", ".pfm": "pfm"}
-    return ext_map.get(Path(filename).suffix.lower())
+    return _EXT_FORMATS.get(os.path.splitext(filename)[1].lower())
 
 
 def cmd_convert(args: argparse.Namespace) -> None:
     """Convert to/from PFM."""
     from pfm.reader import PFMReader
-    from pfm.converters import convert_to, convert_from
+    from pfm.converters import convert_to_bytes, convert_from
     from pfm.spec import MAX_FILE_SIZE
+    from pfm.writer import atomic_write
 
     known_formats = {"json", "csv", "txt", "md"}
 
@@ -189,47 +235,35 @@ def cmd_convert(args: argparse.Namespace) -> None:
         # For "from": infer from input file extension
         resolved = (inferred_from_output if args.direction == "to" and inferred_from_output and inferred_from_output != "pfm" else inferred)
         if not resolved or resolved == "pfm":
-            print(f"Error: Cannot infer format. Specify explicitly:", file=sys.stderr)
-            print(f"  pfm convert {args.direction} <json|csv|txt|md> {input_file}", file=sys.stderr)
-            sys.exit(1)
+            _die(
+                "Cannot infer format. Specify explicitly:\n"
+                f"  pfm convert {args.direction} <json|csv|txt|md> {input_file}"
+            )
         fmt = resolved
 
     if args.direction == "from":
+        from pathlib import Path
+
         # Convert other format -> PFM
-        input_path = Path(input_file)
-        if not input_path.is_file():
-            print(f"Error: File not found: {input_file}", file=sys.stderr)
-            sys.exit(1)
-        file_size = input_path.stat().st_size
-        if file_size > MAX_FILE_SIZE:
-            print(
-                f"Error: File size {file_size} exceeds maximum {MAX_FILE_SIZE} bytes",
-                file=sys.stderr,
-            )
-            sys.exit(1)
-        data = input_path.read_text(encoding="utf-8")
-        doc = convert_from(data, fmt)
-        output = args.output or Path(input_file).stem + ".pfm"
-        # Reject path traversal in output path
-        if ".." in Path(output).parts:
-            print("Error: Output path must not contain '..' (path traversal)", file=sys.stderr)
-            sys.exit(1)
+        if not os.path.isfile(input_file):
+            _die(f"File not found: {input_file}")
+        raw = _read_bytes(input_file, MAX_FILE_SIZE)
+        # The JSON parser takes UTF-8 bytes directly; skip the str copy
+        doc = convert_from(raw if fmt == "json" else raw.decode("utf-8"), fmt)
+        output = _safe_out(args.output or Path(input_file).stem + ".pfm")
         nbytes = doc.write(output)
         print(f"Converted {input_file} -> {output} ({nbytes} bytes)")
 
     elif args.direction == "to":
         # Convert PFM -> other format
+        output = _safe_out(args.output) if args.output else None
         doc = PFMReader.read(input_file)
-        result = convert_to(doc, fmt)
-        if args.output:
-            # Reject path traversal in output path
-            if ".." in Path(args.output).parts:
-                print("Error: Output path must not contain '..' (path traversal)", file=sys.stderr)
-                sys.exit(1)
-            Path(args.output).write_text(result, encoding="utf-8")
-            print(f"Converted {input_file} -> {args.output}")
+        result = convert_to_bytes(doc, fmt)
+        if output:
+            atomic_write(output, result, mode=0o644)
+            print(f"Converted {input_file} -> {output}")
         else:
-            print(result, end="")
+            sys.stdout.buffer.write(result)
 
 
 def cmd_view(args: argparse.Namespace) -> None:
@@ -238,9 +272,11 @@ def cmd_view(args: argparse.Namespace) -> None:
 
     if args.html:
         # Generate standalone HTML file
+        from pathlib import Path
+
         from pfm.web.generator import write_html
 
-        output = args.output or Path(path).stem + ".html"
+        output = _safe_out(args.output or Path(path).stem + ".html")
         nbytes = write_html(path, output)
         print(f"Generated {output} ({nbytes} bytes)")
         return
@@ -267,68 +303,45 @@ def cmd_view(args: argparse.Namespace) -> None:
 
 def cmd_export(args: argparse.Namespace) -> None:
     """Export .pfm conversations to fine-tuning JSONL."""
-    from pfm.export import load_pfm_paths, export_documents
-    from pfm.reader import PFMReader
+    from pfm.export import load_pfm_paths, load_documents, write_jsonl
 
     path = args.path
     fmt = args.format
-    output = args.output or "training.jsonl"
-
-    # Reject path traversal in output
-    if ".." in Path(output).parts:
-        print("Error: Output path must not contain '..' (path traversal)", file=sys.stderr)
-        sys.exit(1)
+    output = _safe_out(args.output or "training.jsonl")
 
     try:
         pfm_paths = load_pfm_paths(path)
     except FileNotFoundError as e:
-        print(f"Error: {e}", file=sys.stderr)
-        sys.exit(1)
+        _die(str(e))
 
     if not pfm_paths:
-        print(f"Error: No .pfm files found in {path}", file=sys.stderr)
-        sys.exit(1)
+        _die(f"No .pfm files found in {path}")
 
     docs = []
-    for p in pfm_paths:
-        try:
-            docs.append(PFMReader.read(str(p)))
-        except Exception as e:
-            print(f"Warning: Skipping {p}: {e}", file=sys.stderr)
+    # The CLI entry point is import-safe, so a process pool may be used
+    for p, result in load_documents(pfm_paths, processes=True):
+        if isinstance(result, Exception):
+            print(f"Warning: Skipping {p}: {result}", file=sys.stderr)
+        else:
+            docs.append(result)
 
     if not docs:
-        print("Error: No valid .pfm files to export", file=sys.stderr)
-        sys.exit(1)
+        _die("No valid .pfm files to export")
 
-    lines, total_turns = export_documents(docs, fmt)
-    Path(output).write_text("\n".join(lines) + "\n", encoding="utf-8")
+    total_turns = write_jsonl(docs, output, fmt)
     print(f"Exported {len(docs)} conversations ({total_turns} turns) -> {output}")
 
 
 def cmd_encrypt(args: argparse.Namespace) -> None:
     """Encrypt a .pfm file with AES-256-GCM."""
-    from pfm.reader import PFMReader
     from pfm.security import encrypt_document
+    from pfm.writer import atomic_write
 
-    doc = PFMReader.read(args.path)
-    password = args.password
-    if not password:
-        import getpass
-        password = getpass.getpass("Password: ")
-        confirm = getpass.getpass("Confirm: ")
-        if password != confirm:
-            print("Error: Passwords do not match", file=sys.stderr)
-            sys.exit(1)
-    if not password:
-        print("Error: Password cannot be empty", file=sys.stderr)
-        sys.exit(1)
+    doc, password = _load_doc_with_secret(args.path, args.password, "Password", confirm=True)
 
-    output = args.output or args.path + ".enc"
-    if ".." in Path(output).parts:
-        print("Error: Output path must not contain '..' (path traversal)", file=sys.stderr)
-        sys.exit(1)
+    output = _safe_out(args.output or args.path + ".enc")
     encrypted = encrypt_document(doc, password)
-    Path(output).write_bytes(encrypted)
+    atomic_write(output, encrypted, mode=0o644)
     print(f"Encrypted {args.path} -> {output} ({len(encrypted)} bytes)")
 
 
@@ -337,74 +350,40 @@ def cmd_decrypt(args: argparse.Namespace) -> None:
     from pfm.security import decrypt_document
 
     from pfm.spec import MAX_FILE_SIZE
-    enc_path = Path(args.path)
-    file_size = enc_path.stat().st_size
-    if file_size > MAX_FILE_SIZE:
-        print(f"Error: File size {file_size} exceeds maximum {MAX_FILE_SIZE} bytes", file=sys.stderr)
-        sys.exit(1)
-    data = enc_path.read_bytes()
-    password = args.password
-    if not password:
-        import getpass
-        password = getpass.getpass("Password: ")
-    if not password:
-        print("Error: Password cannot be empty", file=sys.stderr)
-        sys.exit(1)
+    data = _read_bytes(args.path, MAX_FILE_SIZE)
+    password = _require_secret(args.password, "Password")
 
     try:
         doc = decrypt_document(data, password)
     except Exception:
-        print("Error: Decryption failed (wrong password or corrupted file)", file=sys.stderr)
-        sys.exit(1)
+        _die("Decryption failed (wrong password or corrupted file)")
 
     output = args.output
     if not output:
         # Strip .enc suffix if present
         output = args.path.removesuffix(".enc") if args.path.endswith(".enc") else args.path + ".dec.pfm"
-    if ".." in Path(output).parts:
-        print("Error: Output path must not contain '..' (path traversal)", file=sys.stderr)
-        sys.exit(1)
+    _safe_out(output)
     nbytes = doc.write(output)
     print(f"Decrypted {args.path} -> {output} ({nbytes} bytes)")
 
 
 def cmd_sign(args: argparse.Namespace) -> None:
     """Sign a .pfm file with HMAC-SHA256."""
-    from pfm.reader import PFMReader
     from pfm.security import sign
 
-    doc = PFMReader.read(args.path)
-    secret = args.secret
-    if not secret:
-        import getpass
-        secret = getpass.getpass("Secret: ")
-    if not secret:
-        print("Error: Secret cannot be empty", file=sys.stderr)
-        sys.exit(1)
+    doc, secret = _load_doc_with_secret(args.path, args.secret)
 
     sig = sign(doc, secret)
-    output = args.output or args.path
-    # Reject path traversal in output path
-    if ".." in Path(output).parts:
-        print("Error: Output path must not contain '..' (path traversal)", file=sys.stderr)
-        sys.exit(1)
+    output = _safe_out(args.output or args.path)
     doc.write(output)
     print(f"Signed {output} (sig={sig[:16]}...)")
 
 
 def cmd_verify(args: argparse.Namespace) -> None:
     """Verify the HMAC-SHA256 signature of a .pfm file."""
-    from pfm.reader import PFMReader
     from pfm.security import verify
 
-    doc = PFMReader.read(args.path)
-    secret = args.secret
-    if not secret:
-        import getpass
-        secret = getpass.getpass("Secret: ")
-    if not secret:
-        print("Error: Secret cannot be empty", file=sys.stderr)
-        sys.exit(1)
+    doc, secret = _load_doc_with_secret(args.path, args.secret)
 
     if not doc.custom_meta.get("signature"):
         print(f"FAIL: {args.path} has no signature")
@@ -418,72 +397,72 @@ def cmd_verify(args: argparse.Namespace) -> None:
         sys.exit(1)
 
 
-def cmd_spells(args: argparse.Namespace) -> None:
-    """List all available PFM spells."""
-    print("PFM Spells")
-    print("Aliased API with Harry Potter spell names.\n")
-    print("  accio <file> <section>           Summon a section from a .pfm file")
-    print("                                   (alias for: pfm read)")
-    print()
-    print("  polyjuice <file> <format>        Transform to another format (json, csv, txt, md)")
-    print("                                   (alias for: pfm convert to <format>)")
-    print()
-    print("  fidelius <file> [-p password]     Cast the Fidelius Charm — encrypt a document")
-    print("                                   (alias for: pfm encrypt)")
-    print()
-    print("  revelio <file> [-p password]      Reveal hidden contents — decrypt a document")
-    print("                                   (alias for: pfm decrypt)")
-    print()
-    print("  unbreakable-vow <file> [-s key]   Make an Unbreakable Vow — sign a document")
-    print("                                   (alias for: pfm sign)")
-    print()
-    print("  vow-kept <file> [-s key]          Check if the Vow holds — verify signature")
-    print("                                   (alias for: pfm verify)")
-    print()
-    print("  prior-incantato <file>            Reveal history and integrity of a document")
-    print("                                   (alias for: pfm validate)")
-    print()
-    print("  geminio <file1> <file2> [...]     Merge multiple .pfm files into one (Doubling Charm)")
-    print("                                   (alias for: pfm merge)")
-    print()
-    print("  pensieve <path> [-o out] [--fmt]  Extract memories for training data")
-    print("                                   (alias for: pfm export)")
-    print()
-    print("Usage:")
-    print("  pfm accio report.pfm content")
-    print("  pfm polyjuice report.pfm json -o report.json")
-    print("  pfm fidelius report.pfm -p mypassword")
-    print("  pfm revelio report.pfm.enc -p mypassword")
-    print("  pfm unbreakable-vow report.pfm -s mysecret")
-    print("  pfm vow-kept report.pfm -s mysecret")
-    print("  pfm prior-incantato report.pfm")
-    print("  pfm geminio part1.pfm part2.pfm -o combined.pfm")
-    print()
-    print("Python API:")
-    print("  from pfm.spells import accio, polyjuice, fidelius, revelio")
-    print("  content = accio('report.pfm', 'content')")
+_SPELLS_TEXT = """\
+PFM Spells
+Aliased API with Harry Potter spell names.
+
+  accio <file> <section>           Summon a section from a .pfm file
+                                   (alias for: pfm read)
+
+  polyjuice <file> <format>        Transform to another format (json, csv, txt, md)
+                                   (alias for: pfm convert to <format>)
+
+  fidelius <file> [-p password]     Cast the Fidelius Charm — encrypt a document
+                                   (alias for: pfm encrypt)
+
+  revelio <file> [-p password]      Reveal hidden contents — decrypt a document
+                                   (alias for: pfm decrypt)
+
+  unbreakable-vow <file> [-s key]   Make an Unbreakable Vow — sign a document
+                                   (alias for: pfm sign)
+
+  vow-kept <file> [-s key]          Check if the Vow holds — verify signature
+                                   (alias for: pfm verify)
+
+  prior-incantato <file>            Reveal history and integrity of a document
+                                   (alias for: pfm validate)
+
+  geminio <file1> <file2> [...]     Merge multiple .pfm files into one (Doubling Charm)
+                                   (alias for: pfm merge)
+
+  pensieve <path> [-o out] [--fmt]  Extract memories for training data
+                                   (alias for: pfm export)
+
+Usage:
+  pfm accio report.pfm content
+  pfm polyjuice report.pfm json -o report.json
+  pfm fidelius report.pfm -p mypassword
+  pfm revelio report.pfm.enc -p mypassword
+  pfm unbreakable-vow report.pfm -s mysecret
+  pfm vow-kept report.pfm -s mysecret
+  pfm prior-incantato report.pfm
+  pfm geminio part1.pfm part2.pfm -o combined.pfm
+
+Python API:
+  from pfm.spells import accio, polyjuice, fidelius, revelio
+  content = accio('report.pfm', 'content')
+"""
 
 
-def cmd_accio(args: argparse.Namespace) -> None:
-    """Summon a section from a .pfm file."""
-    cmd_read(args)
+def cmd_spells(args: argparse.Namespace) -> None:
+    """List all available PFM spells."""
+    sys.stdout.write(_SPELLS_TEXT)
 
 
 def cmd_polyjuice(args: argparse.Namespace) -> None:
     """Transform a .pfm file to another format."""
     from pfm.reader import PFMReader
-    from pfm.converters import convert_to
+    from pfm.converters import convert_to_bytes
+    from pfm.writer import atomic_write
 
+    output = _safe_out(args.output) if args.output else None
     doc = PFMReader.read(args.path)
-    result = convert_to(doc, args.format)
-    if args.output:
-        if ".." in Path(args.output).parts:
-            print("Error: Output path must not contain '..' (path traversal)", file=sys.stderr)
-            sys.exit(1)
-        Path(args.output).write_text(result, encoding="utf-8")
-        print(f"Converted {args.path} -> {args.output}")
+    result = convert_to_bytes(doc, args.format)
+    if output:
+        atomic_write(output, result, mode=0o644)
+        print(f"Converted {args.path} -> {output}")
     else:
-        print(result, end="")
+        sys.stdout.buffer.write(result)
 
 
 def cmd_prior_incantato(args: argparse.Namespace) -> None:
@@ -506,6 +485,8 @@ def cmd_prior_incantato(args: argparse.Namespace) -> None:
 
 def cmd_merge(args: argparse.Namespace) -> None:
     """Merge multiple .pfm files into one."""
+    from pathlib import Path
+
     from pfm.spells import geminio
     from pfm.spec import MAX_FILE_SIZE
 
@@ -513,43 +494,35 @@ def cmd_merge(args: argparse.Namespace) -> None:
 
     sources = args.files
     if len(sources) < 2:
-        print("Error: Need at least 2 .pfm files to merge", file=sys.stderr)
-        sys.exit(1)
+        _die("Need at least 2 .pfm files to merge")
 
     if len(sources) > MAX_SOURCE_COUNT:
-        print(f"Error: Too many source files (max {MAX_SOURCE_COUNT})", file=sys.stderr)
-        sys.exit(1)
+        _die(f"Too many source files (max {MAX_SOURCE_COUNT})")
 
     cwd = Path.cwd().resolve()
     for f in sources:
         p = Path(f)
         if not p.is_file():
-            print(f"Error: File not found: {f}", file=sys.stderr)
-            sys.exit(1)
+            _die(f"File not found: {f}")
         if p.suffix.lower() != ".pfm":
-            print(f"Error: Only .pfm files are accepted: {f}", file=sys.stderr)
-            sys.exit(1)
+            _die(f"Only .pfm files are accepted: {f}")
         try:
             size = p.stat().st_size
         except OSError:
-            print(f"Error: Cannot stat file: {f}", file=sys.stderr)
-            sys.exit(1)
+            _die(f"Cannot stat file: {f}")
         if size > MAX_FILE_SIZE:
-            print(f"Error: File too large (>{MAX_FILE_SIZE} bytes): {f}", file=sys.stderr)
-            sys.exit(1)
+            _die(f"File too large (>{MAX_FILE_SIZE} bytes): {f}")
 
     merged = geminio(*sources, agent=args.agent or "", model=args.model or "")
 
-    output = args.output or "merged.pfm"
-    if Path(output).is_absolute() or ".." in Path(output).parts:
-        print("Error: Output path must be a relative path without traversal", file=sys.stderr)
-        sys.exit(1)
+    output = _safe_out(args.output or "merged.pfm")
+    if os.path.isabs(output):
+        _die("Output path must be a relative path")
     resolved = Path(output).resolve()
     try:
         resolved.relative_to(cwd)
     except ValueError:
-        print("Error: Output path must be within the current directory", file=sys.stderr)
-        sys.exit(1)
+        _die("Output path must be within the current directory")
     nbytes = merged.write(output)
     parent_count = len(merged.parent.split(", ")) if merged.parent else 0
     print(f"Merged {len(sources)} files -> {output} ({nbytes} bytes)")
@@ -560,224 +533,416 @@ def cmd_merge(args: argparse.Namespace) -> None:
 
 def cmd_identify(args: argparse.Namespace) -> None:
     """Quick check if a file is PFM format."""
-    from pfm.reader import PFMReader
+    _identify(args.path)
+
 
-    is_pfm = PFMReader.is_pfm(args.path)
+def _identify(path: str) -> None:
+    """Report whether ``path`` is a PFM file and exit 0 (yes) or 1 (no).
+
+    Reads only the magic bytes with a raw os.open/os.read pair — no reader
+    machinery is imported. Unreadable paths are reported as not PFM.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            head = os.read(fd, len(_MAGIC_BYTES))
+        finally:
+            os.close(fd)
+    except OSError:
+        head = b""
+    is_pfm = head == _MAGIC_BYTES
     if is_pfm:
-        print(f"{args.path}: PFM file")
+        print(f"{path}: PFM file")
     else:
-        print(f"{args.path}: not PFM")
+        print(f"{path}: not PFM")
     sys.exit(0 if is_pfm else 1)
 
 
-def main() -> None:
+def _read_secret(prompt: str) -> str:
+    """Read one line from the controlling terminal with echo turned off.
+
+    Talks to /dev/tty directly with termios, so the common path does not
+    load getpass. Falls back to getpass where there is no /dev/tty or no
+    termios (Windows, detached processes).
+    """
+    try:
+        import termios
+
+        fd = os.open("/dev/tty", os.O_RDWR | os.O_NOCTTY)
+    except (ImportError, OSError):
+        fd = -1
+    if fd >= 0:
+        try:
+            old = termios.tcgetattr(fd)
+        except termios.error:
+            os.close(fd)
+            fd = -1
+    if fd < 0:
+        import getpass
+
+        return getpass.getpass(prompt)
+
+    try:
+        quiet = list(old)
+        quiet[3] &= ~termios.ECHO  # lflag
+        os.write(fd, prompt.encode("utf-8"))
+        termios.tcsetattr(fd, termios.TCSAFLUSH, quiet)
+        line = bytearray()
+        try:
+            while not line.endswith(b"\n"):
+                chunk = os.read(fd, 1024)
+                if not chunk:
+                    break
+                line += chunk
+        finally:
+            termios.tcsetattr(fd, termios.TCSAFLUSH, old)
+            os.write(fd, b"\n")
+    finally:
+        os.close(fd)
+    return line.decode("utf-8", errors="replace").rstrip("\r\n")
+
+
+_PROMPT_ATTEMPTS = 3
+
+
+def _prompt_secret(prompt: str, confirm: bool = False) -> str:
+    """Prompt for a password/secret on the terminal without echo.
+
+    With ``confirm``, the value is asked for twice and must match, unless
+    PFM_CONFIRM_PASSWORD=0 is set in the environment. A mismatch re-prompts
+    (up to three attempts) instead of throwing away the whole command.
+    """
+    confirm = confirm and os.environ.get("PFM_CONFIRM_PASSWORD", "") != "0"
+    for attempt in range(_PROMPT_ATTEMPTS):
+        value = _read_secret(prompt)
+        if not confirm or value == _read_secret("Confirm: "):
+            return value
+        if attempt + 1 < _PROMPT_ATTEMPTS:
+            print("Passwords do not match, try again.", file=sys.stderr)
+    _die("Passwords do not match")
+
+
+def _require_secret(value: str | None, what: str = "Secret", confirm: bool = False) -> str:
+    """Return ``value``, prompting for it if not given. Exits if it is empty."""
+    if not value:
+        value = _prompt_secret(f"{what}: ", confirm=confirm)
+    if not value:
+        _die(f"{what} cannot be empty")
+    return value
+
+
+def _load_doc_with_secret(
+    path: str, secret: str | None, what: str = "Secret", confirm: bool = False
+) -> tuple[PFMDocument, str]:
+    """Read the document at ``path`` and obtain the secret used on it."""
+    from pfm.reader import PFMReader
+
+    doc = PFMReader.read(path)
+    return doc, _require_secret(secret, what, confirm)
+
+
+def _read_bytes(path: str, max_size: int) -> bytearray:
+    """Read a whole file using one open and one fstat.
+
+    The data is read straight into a buffer preallocated from the fstat
+    size, with no intermediate chunk list or join. Exits with an error if
+    the file is larger than ``max_size`` bytes.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        if size > max_size:
+            _die(f"File size {size} exceeds maximum {max_size} bytes")
+        buf = bytearray(size)
+        pos = 0
+        readv = getattr(os, "readv", None)  # POSIX only
+        with memoryview(buf) as view:
+            while pos < size:
+                if readv is not None:
+                    n = readv(fd, [view[pos:]])
+                else:
+                    chunk = os.read(fd, size - pos)
+                    n = len(chunk)
+                    view[pos:pos + n] = chunk
+                if not n:
+                    break
+                pos += n
+        del buf[pos:]  # file shrank after fstat
+        return buf
+    finally:
+        os.close(fd)
+
+
+# =============================================================================
+# Argument parsing
+# =============================================================================
+#
+# Each command registers its own subparser through a small builder so that
+# main() only has to construct the one subparser that is actually being run.
+# The full tree is only built for top-level --help and usage errors.
+
+def _add_create(sub: argparse._SubParsersAction) -> None:
+    p = sub.add_parser("create", help="Create a new .pfm file")
+    p.add_argument("-o", "--output", help="Output file path")
+    p.add_argument("-a", "--agent", help="Agent name")
+    p.add_argument("-m", "--model", help="Model ID")
+    p.add_argument("-c", "--content", help="Content string")
+    p.add_argument("-f", "--file", help="Read content from file")
+    p.add_argument("--chain", help="Prompt chain")
+    p.add_argument("--sign", help="Sign with HMAC-SHA256 secret (or set PFM_SIGN_SECRET env var)")
+    p.add_argument("--encrypt", help="Encrypt with password (or set PFM_ENCRYPT_PASSWORD env var)")
+
+
+def _add_inspect(sub: argparse._SubParsersAction) -> None:
+    p = sub.add_parser("inspect", help="Inspect a .pfm file")
+    p.add_argument("path", help="Path to .pfm file")
+
+
+def _add_read(sub: argparse._SubParsersAction) -> None:
+    p = sub.add_parser("read", help="Read a section from a .pfm file")
+    p.add_argument("path", help="Path to .pfm file")
+    p.add_argument("section", help="Section name to read")
+
+
+def _add_validate(sub: argparse._SubParsersAction) -> None:
+    p = sub.add_parser("validate", help="Validate a .pfm file")
+    p.add_argument("path", help="Path to .pfm file")
+
+
+def _add_convert(sub: argparse._SubParsersAction) -> None:
+    p = sub.add_parser("convert", help="Convert to/from PFM")
+    p.add_argument("direction", choices=["to", "from"], help="Conversion direction")
+    p.add_argument("format_or_input", help="Format (json, csv, txt, md) or input file")
+    p.add_argument("input", nargs="?", default=None, help="Input file path")
+    p.add_argument("-o", "--output", help="Output file path")
+
+
+def _add_merge(sub: argparse._SubParsersAction, name: str = "merge",
+               help_text: str = "Merge multiple .pfm files into one") -> None:
+    p = sub.add_parser(name, help=help_text)
+    p.add_argument("files", nargs="+", help="Two or more .pfm files to merge")
+    p.add_argument("-o", "--output", help="Output file path (default: merged.pfm)")
+    p.add_argument("-a", "--agent", help="Agent name for merged doc")
+    p.add_argument("-m", "--model", help="Model ID for merged doc")
+
+
+def _add_view(sub: argparse._SubParsersAction) -> None:
+    p = sub.add_parser("view", help="View a .pfm file (TUI, web, or HTML)")
+    p.add_argument("path", help="Path to .pfm file")
+    p.add_argument("--web", action="store_true", help="Open in web browser (local server)")
+    p.add_argument("--html", action="store_true", help="Generate standalone HTML file")
+    p.add_argument("-o", "--output", help="Output path for --html mode")
+
+
+def _add_encrypt(sub: argparse._SubParsersAction, name: str = "encrypt",
+                 help_text: str = "Encrypt a .pfm file with AES-256-GCM") -> None:
+    p = sub.add_parser(name, help=help_text)
+    p.add_argument("path", help="Path to .pfm file")
+    p.add_argument("-p", "--password", help="Encryption password (prompted if omitted)")
+    p.add_argument("-o", "--output", help="Output path (default: <path>.enc)")
+
+
+def _add_decrypt(sub: argparse._SubParsersAction, name: str = "decrypt",
+                 help_text: str = "Decrypt an encrypted .pfm file") -> None:
+    p = sub.add_parser(name, help=help_text)
+    p.add_argument("path", help="Path to encrypted file")
+    p.add_argument("-p", "--password", help="Decryption password (prompted if omitted)")
+    p.add_argument("-o", "--output", help="Output path")
+
+
+def _add_sign(sub: argparse._SubParsersAction, name: str = "sign",
+              help_text: str = "Sign a .pfm file with HMAC-SHA256") -> None:
+    p = sub.add_parser(name, help=help_text)
+    p.add_argument("path", help="Path to .pfm file")
+    p.add_argument("-s", "--secret", help="Signing secret (prompted if omitted)")
+    p.add_argument("-o", "--output", help="Output path (default: overwrite input)")
+
+
+def _add_verify(sub: argparse._SubParsersAction, name: str = "verify",
+                help_text: str = "Verify HMAC-SHA256 signature") -> None:
+    p = sub.add_parser(name, help=help_text)
+    p.add_argument("path", help="Path to .pfm file")
+    p.add_argument("-s", "--secret", help="Signing secret (prompted if omitted)")
+
+
+def _add_identify(sub: argparse._SubParsersAction) -> None:
+    p = sub.add_parser("identify", help="Quick check if a file is PFM")
+    p.add_argument("path", help="Path to file")
+
+
+def _add_spells(sub: argparse._SubParsersAction) -> None:
+    sub.add_parser("spells", help="List all PFM spells (aliased commands)")
+
+
+def _add_accio(sub: argparse._SubParsersAction) -> None:
+    p = sub.add_parser("accio", help="Summon a section from a .pfm file")
+    p.add_argument("path", help="Path to .pfm file")
+    p.add_argument("section", help="Section name to summon")
+
+
+def _add_polyjuice(sub: argparse._SubParsersAction) -> None:
+    p = sub.add_parser("polyjuice", help="Transform a .pfm file to another format")
+    p.add_argument("path", help="Path to .pfm file")
+    p.add_argument("format", choices=["json", "csv", "txt", "md"], help="Target format")
+    p.add_argument("-o", "--output", help="Output file path")
+
+
+def _add_prior_incantato(sub: argparse._SubParsersAction) -> None:
+    p = sub.add_parser("prior-incantato", help="Reveal history and integrity")
+    p.add_argument("path", help="Path to .pfm file")
+
+
+def _add_export(sub: argparse._SubParsersAction, name: str = "export",
+                help_text: str = "Export .pfm conversations to fine-tuning JSONL") -> None:
+    p = sub.add_parser(name, help=help_text)
+    p.add_argument("path", help="Path to .pfm file or directory")
+    p.add_argument("-o", "--output", help="Output JSONL file (default: training.jsonl)")
+    p.add_argument("--format", choices=["openai", "alpaca", "sharegpt"], default="openai", help="Export format (default: openai)")
+
+
+# command name -> (subparser builder, handler). Order is the --help listing order.
+# Built once at import. Spell aliases (accio, fidelius, revelio, ...) reuse the
+# canonical command's handler and builder rather than wrapping them.
+_COMMANDS: dict[str, tuple[Callable[[argparse._SubParsersAction], None], Callable[[argparse.Namespace], None]]] = {
+    "create": (_add_create, cmd_create),
+    "inspect": (_add_inspect, cmd_inspect),
+    "read": (_add_read, cmd_read),
+    "validate": (_add_validate, cmd_validate),
+    "convert": (_add_convert, cmd_convert),
+    "merge": (_add_merge, cmd_merge),
+    "view": (_add_view, cmd_view),
+    "encrypt": (_add_encrypt, cmd_encrypt),
+    "decrypt": (_add_decrypt, cmd_decrypt),
+    "sign": (_add_sign, cmd_sign),
+    "verify": (_add_verify, cmd_verify),
+    "identify": (_add_identify, cmd_identify),
+    "spells": (_add_spells, cmd_spells),
+    "accio": (_add_accio, cmd_read),
+    "polyjuice": (_add_polyjuice, cmd_polyjuice),
+    "fidelius": (
+        lambda sub: _add_encrypt(sub, "fidelius", "Encrypt a .pfm file (Fidelius Charm)"),
+        cmd_encrypt,
+    ),
+    "revelio": (
+        lambda sub: _add_decrypt(sub, "revelio", "Decrypt an encrypted .pfm file"),
+        cmd_decrypt,
+    ),
+    "unbreakable-vow": (
+        lambda sub: _add_sign(sub, "unbreakable-vow", "Sign a .pfm file (Unbreakable Vow)"),
+        cmd_sign,
+    ),
+    "vow-kept": (
+        lambda sub: _add_verify(sub, "vow-kept", "Verify signature (check the Vow)"),
+        cmd_verify,
+    ),
+    "prior-incantato": (_add_prior_incantato, cmd_prior_incantato),
+    "geminio": (
+        lambda sub: _add_merge(sub, "geminio", "Merge .pfm files (Doubling Charm)"),
+        cmd_merge,
+    ),
+    "export": (_add_export, cmd_export),
+    "pensieve": (
+        lambda sub: _add_export(sub, "pensieve", "Extract memories for training (Pensieve)"),
+        cmd_export,
+    ),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _get_parser(command: str | None = None) -> argparse.ArgumentParser:
+    """Build (once per process) the argument parser.
+
+    If ``command`` is a known subcommand, only its subparser is added.
+    Otherwise every subparser is added so --help and usage errors list them all.
+    Parsers hold no per-parse state, so they are cached and reused when
+    main() is called repeatedly in one process. Callers pass None for
+    unknown commands to keep the cache bounded.
+    """
+    import argparse
+
+    from pfm import __version__
+
     parser = argparse.ArgumentParser(
         prog="pfm",
         description="PFM - Pure Fucking Magic. AI agent output container format.",
     )
-    from pfm import __version__
     parser.add_argument("--version", action="version", version=f"pfm {__version__}")
     sub = parser.add_subparsers(dest="command")
 
-    # create
-    p_create = sub.add_parser("create", help="Create a new .pfm file")
-    p_create.add_argument("-o", "--output", help="Output file path")
-    p_create.add_argument("-a", "--agent", help="Agent name")
-    p_create.add_argument("-m", "--model", help="Model ID")
-    p_create.add_argument("-c", "--content", help="Content string")
-    p_create.add_argument("-f", "--file", help="Read content from file")
-    p_create.add_argument("--chain", help="Prompt chain")
-    p_create.add_argument("--sign", help="Sign with HMAC-SHA256 secret (or set PFM_SIGN_SECRET env var)")
-    p_create.add_argument("--encrypt", help="Encrypt with password (or set PFM_ENCRYPT_PASSWORD env var)")
-
-    # inspect
-    p_inspect = sub.add_parser("inspect", help="Inspect a .pfm file")
-    p_inspect.add_argument("path", help="Path to .pfm file")
-
-    # read
-    p_read = sub.add_parser("read", help="Read a section from a .pfm file")
-    p_read.add_argument("path", help="Path to .pfm file")
-    p_read.add_argument("section", help="Section name to read")
-
-    # validate
-    p_validate = sub.add_parser("validate", help="Validate a .pfm file")
-    p_validate.add_argument("path", help="Path to .pfm file")
-
-    # convert
-    p_convert = sub.add_parser("convert", help="Convert to/from PFM")
-    p_convert.add_argument("direction", choices=["to", "from"], help="Conversion direction")
-    p_convert.add_argument("format_or_input", help="Format (json, csv, txt, md) or input file")
-    p_convert.add_argument("input", nargs="?", default=None, help="Input file path")
-    p_convert.add_argument("-o", "--output", help="Output file path")
-
-    # merge
-    p_merge = sub.add_parser("merge", help="Merge multiple .pfm files into one")
-    p_merge.add_argument("files", nargs="+", help="Two or more .pfm files to merge")
-    p_merge.add_argument("-o", "--output", help="Output file path (default: merged.pfm)")
-    p_merge.add_argument("-a", "--agent", help="Agent name for merged doc")
-    p_merge.add_argument("-m", "--model", help="Model ID for merged doc")
-
-    # view
-    p_view = sub.add_parser("view", help="View a .pfm file (TUI, web, or HTML)")
-    p_view.add_argument("path", help="Path to .pfm file")
-    p_view.add_argument("--web", action="store_true", help="Open in web browser (local server)")
-    p_view.add_argument("--html", action="store_true", help="Generate standalone HTML file")
-    p_view.add_argument("-o", "--output", help="Output path for --html mode")
-
-    # encrypt
-    p_encrypt = sub.add_parser("encrypt", help="Encrypt a .pfm file with AES-256-GCM")
-    p_encrypt.add_argument("path", help="Path to .pfm file")
-    p_encrypt.add_argument("-p", "--password", help="Encryption password (prompted if omitted)")
-    p_encrypt.add_argument("-o", "--output", help="Output path (default: <path>.enc)")
-
-    # decrypt
-    p_decrypt = sub.add_parser("decrypt", help="Decrypt an encrypted .pfm file")
-    p_decrypt.add_argument("path", help="Path to encrypted file")
-    p_decrypt.add_argument("-p", "--password", help="Decryption password (prompted if omitted)")
-    p_decrypt.add_argument("-o", "--output", help="Output path")
-
-    # sign
-    p_sign = sub.add_parser("sign", help="Sign a .pfm file with HMAC-SHA256")
-    p_sign.add_argument("path", help="Path to .pfm file")
-    p_sign.add_argument("-s", "--secret", help="Signing secret (prompted if omitted)")
-    p_sign.add_argument("-o", "--output", help="Output path (default: overwrite input)")
-
-    # verify
-    p_verify = sub.add_parser("verify", help="Verify HMAC-SHA256 signature")
-    p_verify.add_argument("path", help="Path to .pfm file")
-    p_verify.add_argument("-s", "--secret", help="Signing secret (prompted if omitted)")
-
-    # identify
-    p_identify = sub.add_parser("identify", help="Quick check if a file is PFM")
-    p_identify.add_argument("path", help="Path to file")
-
-    # spells
-    sub.add_parser("spells", help="List all PFM spells (aliased commands)")
+    if command in _COMMANDS:
+        _COMMANDS[command][0](sub)
+    else:
+        for add_parser, _handler in _COMMANDS.values():
+            add_parser(sub)
+    return parser
+
+
+def _print_usage() -> None:
+    """Print the short usage overview shown when pfm is run without arguments."""
+    print("PFM - Pure Fucking Magic")
+    print("AI agent output container format.\n")
+    print("Usage:")
+    print("  pfm create -a \"my-agent\" -m \"gpt-4\" -c \"Hello world\" -o output.pfm")
+    print("  pfm inspect output.pfm")
+    print("  pfm read output.pfm content")
+    print("  pfm validate output.pfm")
+    print("  pfm convert to json output.pfm -o output.json")
+    print("  pfm convert from json data.json -o imported.pfm")
+    print("  pfm view output.pfm")
+    print("  pfm encrypt output.pfm -p mypassword")
+    print("  pfm decrypt output.pfm.enc -p mypassword")
+    print("  pfm sign output.pfm -s mysecret")
+    print("  pfm verify output.pfm -s mysecret")
+    print("  pfm merge part1.pfm part2.pfm -o combined.pfm")
+    print("  pfm export ./conversations/ -o training.jsonl --format openai")
+    print("  pfm identify output.pfm")
+    print()
+    print("Pipe from stdin:")
+    print("  echo \"Hello\" | pfm create -a cli -o hello.pfm")
+    print("  cat report.txt | pfm create -a importer -m gpt-4 -o report.pfm")
+    print()
+    print("Spells (aliased commands):")
+    print("  pfm accio report.pfm content         Summon a section")
+    print("  pfm polyjuice report.pfm json         Transform format")
+    print("  pfm fidelius report.pfm               Encrypt (Fidelius Charm)")
+    print("  pfm revelio report.pfm.enc            Decrypt (Revelio)")
+    print("  pfm unbreakable-vow report.pfm        Sign (Unbreakable Vow)")
+    print("  pfm prior-incantato report.pfm        Integrity + provenance")
+    print("  pfm geminio part1.pfm part2.pfm       Merge files (Doubling Charm)")
+    print("  pfm pensieve ./conversations/         Extract training data")
+    print()
+    print("Run 'pfm spells' for the full spellbook.")
+    print("Run 'pfm <command> --help' for details on any command.")
+    print("Run 'pfm --version' for version info.")
+
+
+def main(argv: list[str] | None = None) -> None:
+    if argv is None:
+        argv = sys.argv[1:]
+
+    # Fast paths: answers known without building any parser
+    if not argv:
+        _print_usage()
+        sys.exit(0)
+    if argv == ["--version"]:
+        from pfm import __version__
+        print(f"pfm {__version__}")
+        return
+
+    command = argv[0]
+
+    # Fast path: `pfm identify <file>` is typically run over many files in a
+    # loop, so skip argparse entirely for the plain form.
+    if command == "identify" and len(argv) == 2 and not argv[1].startswith("-"):
+        _identify(argv[1])
 
-    # accio (alias for read)
-    p_accio = sub.add_parser("accio", help="Summon a section from a .pfm file")
-    p_accio.add_argument("path", help="Path to .pfm file")
-    p_accio.add_argument("section", help="Section name to summon")
-
-    # polyjuice (alias for convert to)
-    p_polyjuice = sub.add_parser("polyjuice", help="Transform a .pfm file to another format")
-    p_polyjuice.add_argument("path", help="Path to .pfm file")
-    p_polyjuice.add_argument("format", choices=["json", "csv", "txt", "md"], help="Target format")
-    p_polyjuice.add_argument("-o", "--output", help="Output file path")
-
-    # fidelius (alias for encrypt)
-    p_fidelius = sub.add_parser("fidelius", help="Encrypt a .pfm file (Fidelius Charm)")
-    p_fidelius.add_argument("path", help="Path to .pfm file")
-    p_fidelius.add_argument("-p", "--password", help="Encryption password (prompted if omitted)")
-    p_fidelius.add_argument("-o", "--output", help="Output path (default: <path>.enc)")
-
-    # revelio (alias for decrypt)
-    p_revelio = sub.add_parser("revelio", help="Decrypt an encrypted .pfm file")
-    p_revelio.add_argument("path", help="Path to encrypted file")
-    p_revelio.add_argument("-p", "--password", help="Decryption password (prompted if omitted)")
-    p_revelio.add_argument("-o", "--output", help="Output path")
-
-    # unbreakable-vow (alias for sign)
-    p_vow = sub.add_parser("unbreakable-vow", help="Sign a .pfm file (Unbreakable Vow)")
-    p_vow.add_argument("path", help="Path to .pfm file")
-    p_vow.add_argument("-s", "--secret", help="Signing secret (prompted if omitted)")
-    p_vow.add_argument("-o", "--output", help="Output path (default: overwrite input)")
-
-    # vow-kept (alias for verify)
-    p_vow_kept = sub.add_parser("vow-kept", help="Verify signature (check the Vow)")
-    p_vow_kept.add_argument("path", help="Path to .pfm file")
-    p_vow_kept.add_argument("-s", "--secret", help="Signing secret (prompted if omitted)")
-
-    # prior-incantato (alias for validate, with provenance)
-    p_prior = sub.add_parser("prior-incantato", help="Reveal history and integrity")
-    p_prior.add_argument("path", help="Path to .pfm file")
-
-    # geminio (alias for merge)
-    p_geminio = sub.add_parser("geminio", help="Merge .pfm files (Doubling Charm)")
-    p_geminio.add_argument("files", nargs="+", help="Two or more .pfm files to merge")
-    p_geminio.add_argument("-o", "--output", help="Output file path (default: merged.pfm)")
-    p_geminio.add_argument("-a", "--agent", help="Agent name for merged doc")
-    p_geminio.add_argument("-m", "--model", help="Model ID for merged doc")
-
-    # export
-    p_export = sub.add_parser("export", help="Export .pfm conversations to fine-tuning JSONL")
-    p_export.add_argument("path", help="Path to .pfm file or directory")
-    p_export.add_argument("-o", "--output", help="Output JSONL file (default: training.jsonl)")
-    p_export.add_argument("--format", choices=["openai", "alpaca", "sharegpt"], default="openai", help="Export format (default: openai)")
-
-    # pensieve (alias for export)
-    p_pensieve = sub.add_parser("pensieve", help="Extract memories for training (Pensieve)")
-    p_pensieve.add_argument("path", help="Path to .pfm file or directory")
-    p_pensieve.add_argument("-o", "--output", help="Output JSONL file (default: training.jsonl)")
-    p_pensieve.add_argument("--format", choices=["openai", "alpaca", "sharegpt"], default="openai", help="Export format (default: openai)")
-
-    args = parser.parse_args()
+    args = _get_parser(command if command in _COMMANDS else None).parse_args(argv)
 
     if not args.command:
-        print("PFM - Pure Fucking Magic")
-        print("AI agent output container format.\n")
-        print("Usage:")
-        print("  pfm create -a \"my-agent\" -m \"gpt-4\" -c \"Hello world\" -o output.pfm")
-        print("  pfm inspect output.pfm")
-        print("  pfm read output.pfm content")
-        print("  pfm validate output.pfm")
-        print("  pfm convert to json output.pfm -o output.json")
-        print("  pfm convert from json data.json -o imported.pfm")
-        print("  pfm view output.pfm")
-        print("  pfm encrypt output.pfm -p mypassword")
-        print("  pfm decrypt output.pfm.enc -p mypassword")
-        print("  pfm sign output.pfm -s mysecret")
-        print("  pfm verify output.pfm -s mysecret")
-        print("  pfm merge part1.pfm part2.pfm -o combined.pfm")
-        print("  pfm export ./conversations/ -o training.jsonl --format openai")
-        print("  pfm identify output.pfm")
-        print()
-        print("Pipe from stdin:")
-        print("  echo \"Hello\" | pfm create -a cli -o hello.pfm")
-        print("  cat report.txt | pfm create -a importer -m gpt-4 -o report.pfm")
-        print()
-        print("Spells (aliased commands):")
-        print("  pfm accio report.pfm content         Summon a section")
-        print("  pfm polyjuice report.pfm json         Transform format")
-        print("  pfm fidelius report.pfm               Encrypt (Fidelius Charm)")
-        print("  pfm revelio report.pfm.enc            Decrypt (Revelio)")
-        print("  pfm unbreakable-vow report.pfm        Sign (Unbreakable Vow)")
-        print("  pfm prior-incantato report.pfm        Integrity + provenance")
-        print("  pfm geminio part1.pfm part2.pfm       Merge files (Doubling Charm)")
-        print("  pfm pensieve ./conversations/         Extract training data")
-        print()
-        print("Run 'pfm spells' for the full spellbook.")
-        print("Run 'pfm <command> --help' for details on any command.")
-        print("Run 'pfm --version' for version info.")
+        _print_usage()
         sys.exit(0)
 
-    commands = {
-        "create": cmd_create,
-        "inspect": cmd_inspect,
-        "read": cmd_read,
-        "validate": cmd_validate,
-        "convert": cmd_convert,
-        "view": cmd_view,
-        "encrypt": cmd_encrypt,
-        "decrypt": cmd_decrypt,
-        "sign": cmd_sign,
-        "verify": cmd_verify,
-        "identify": cmd_identify,
-        "spells": cmd_spells,
-        "accio": cmd_accio,
-        "polyjuice": cmd_polyjuice,
-        "fidelius": cmd_encrypt,
-        "revelio": cmd_decrypt,
-        "unbreakable-vow": cmd_sign,
-        "vow-kept": cmd_verify,
-        "prior-incantato": cmd_prior_incantato,
-        "merge": cmd_merge,
-        "geminio": cmd_merge,
-        "export": cmd_export,
-        "pensieve": cmd_export,
-    }
-
-    commands[args.command](args)
+    _COMMANDS[args.command][1](args)
 
 
 if __name__ == "__main__":
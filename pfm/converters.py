@@ -10,21 +10,49 @@ Every format goes both ways:
 
 from __future__ import annotations
 
-import csv
 import io
 import json
+import re
 from typing import Any
 
 from pfm.document import PFMDocument, PFMSection
 from pfm.spec import META_ALLOWLIST
 
+# Optional C-accelerated JSON. For valid Unicode its output matches the
+# stdlib path; strings orjson refuses (lone surrogates, which from_json can
+# produce from JSON "\ud800" escapes) are encoded by the stdlib instead.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Reused stdlib codecs: json.dumps() with non-default options builds a new
+# encoder per call, and decoding str input directly skips loads()' checks
+_JSON_DECODER = json.JSONDecoder()
+_JSON_ENCODER_INDENT_2 = json.JSONEncoder(indent=2, ensure_ascii=False)
+
 
 # =============================================================================
 # JSON
 # =============================================================================
 
-def to_json(doc: PFMDocument, indent: int = 2) -> str:
-    """Convert PFM document to JSON string."""
+def _loads(json_str: str | bytes) -> Any:
+    """json.loads, via orjson when installed.
+
+    orjson rejects a few inputs the stdlib accepts (NaN/Infinity, integers
+    wider than 64 bits), so those fall back to the stdlib parser.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(json_str)
+        except orjson.JSONDecodeError:
+            pass
+    if isinstance(json_str, str):
+        return _JSON_DECODER.decode(json_str)
+    return json.loads(json_str)
+
+
+def _json_data(doc: PFMDocument) -> dict[str, Any]:
     data: dict[str, Any] = {
         "pfm_version": doc.format_version,
         "meta": doc.get_meta_dict(),
@@ -35,11 +63,41 @@ def to_json(doc: PFMDocument, indent: int = 2) -> str:
             "name": section.name,
             "content": section.content,
         })
+    return data
+
+
+def to_json(doc: PFMDocument, indent: int = 2) -> str:
+    """Convert PFM document to JSON string."""
+    data = _json_data(doc)
+    if orjson is not None and indent == 2:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except orjson.JSONEncodeError:
+            pass  # lone surrogates: the stdlib encoder accepts them
+    if indent == 2:
+        return _JSON_ENCODER_INDENT_2.encode(data)
     return json.dumps(data, indent=indent, ensure_ascii=False)
 
 
-def from_json(json_str: str) -> PFMDocument:
-    """Create PFM document from JSON string.
+def to_json_bytes(doc: PFMDocument) -> bytes:
+    """Convert PFM document to UTF-8 encoded JSON (same text as to_json).
+
+    With orjson installed the encoder's bytes are returned as-is, so no
+    str is materialized and nothing is re-encoded. Text that is not valid
+    UTF-8 (lone surrogates) goes through the stdlib encoder and raises
+    UnicodeEncodeError, as encoding to_json()'s output would.
+    """
+    data = _json_data(doc)
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            pass
+    return _JSON_ENCODER_INDENT_2.encode(data).encode("utf-8")
+
+
+def from_json(json_str: str | bytes) -> PFMDocument:
+    """Create PFM document from a JSON string or UTF-8 encoded bytes.
 
     If the JSON has PFM structure (pfm_version, meta, sections), it's parsed
     as a PFM export. Otherwise, the raw JSON is wrapped as content in a new document.
@@ -47,12 +105,12 @@ def from_json(json_str: str) -> PFMDocument:
     Validates the structure of PFM JSON to prevent type confusion attacks.
     Rejects keys that could cause prototype-pollution-like issues in downstream JS.
     """
-    data = json.loads(json_str)
+    data = _loads(json_str)
 
     # If it's not a PFM-structured export, wrap raw JSON as content
     if not isinstance(data, dict) or "sections" not in data:
         doc = PFMDocument.create(agent="json-import")
-        doc.add_section("content", json.dumps(data, indent=2, ensure_ascii=False))
+        doc.add_section("content", _JSON_ENCODER_INDENT_2.encode(data))
         return doc
 
     meta = data.get("meta", {})
@@ -103,6 +161,9 @@ def from_json(json_str: str) -> PFMDocument:
 # CSV
 # =============================================================================
 
+_FORMULA_CHARS = frozenset("=+-@\t\r;")
+
+
 def _escape_csv_formula(value: str) -> str:
     """Escape CSV formula injection characters (=, +, -, @, tab, CR, ;).
 
@@ -111,33 +172,52 @@ def _escape_csv_formula(value: str) -> str:
     Per OWASP: also handles semicolons (formula initiator in some locales)
     and leading whitespace before dangerous characters.
     """
+    if not value:
+        return value
+    first = value[0]
+    if not first.isspace():
+        # Common case: no leading whitespace, so no lstrip() copy
+        return "'" + value if first in _FORMULA_CHARS else value
     stripped = value.lstrip()
-    if stripped and stripped[0] in ("=", "+", "-", "@", "\t", "\r", ";"):
+    if stripped and stripped[0] in _FORMULA_CHARS:
         return "'" + value
     return value
 
 
+def _csv_cell(value: str) -> str:
+    """Quote a cell exactly as csv.writer's default (excel) dialect would."""
+    if "," in value or '"' in value or "\n" in value or "\r" in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
 def to_csv(doc: PFMDocument) -> str:
     """
     Convert PFM document to CSV.
     Row format: type, key/name, value/content
     First rows are meta fields, then section rows.
 
+    The three-column layout is fixed, so rows are joined directly rather
+    than going through csv.writer; the output is identical.
+
     Security: Escapes formula injection characters to prevent spreadsheet attacks.
     """
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    writer.writerow(["type", "key", "value"])
+    rows = ["type,key,value"]
 
     # Meta rows
     for key, val in doc.get_meta_dict().items():
-        writer.writerow(["meta", _escape_csv_formula(key), _escape_csv_formula(val)])
+        rows.append(
+            f"meta,{_csv_cell(_escape_csv_formula(key))},{_csv_cell(_escape_csv_formula(val))}"
+        )
 
     # Section rows
     for section in doc.sections:
-        writer.writerow(["section", section.name, _escape_csv_formula(section.content)])
+        rows.append(
+            f"section,{_csv_cell(section.name)},{_csv_cell(_escape_csv_formula(section.content))}"
+        )
 
-    return buf.getvalue()
+    rows.append("")
+    return "\r\n".join(rows)
 
 
 def from_csv(csv_str: str) -> PFMDocument:
@@ -148,6 +228,10 @@ def from_csv(csv_str: str) -> PFMDocument:
     stored as section content). We temporarily increase the limit to
     match PFM's MAX_FILE_SIZE.
     """
+    # csv is only needed for parsing (to_csv quotes cells itself), so it
+    # stays off the import path of every other converter
+    import csv
+
     from pfm.spec import MAX_META_FIELDS, MAX_FILE_SIZE
 
     # Increase field size limit for large PFM content sections
@@ -158,26 +242,26 @@ def from_csv(csv_str: str) -> PFMDocument:
         header = next(reader, None)  # Skip header row
 
         doc = PFMDocument()
+        # Hot loop: bind everything it touches to locals once
+        fields = doc.__dict__
+        custom_meta = doc.custom_meta
+        add_section = doc.add_section
+        allowlist = META_ALLOWLIST
 
         for row in reader:
             if len(row) < 3:
                 continue
+            # csv.reader only yields str cells, so no type checks are needed
             row_type, key, value = row[0], row[1], row[2]
 
-            # Validate types are strings
-            if not isinstance(key, str) or not isinstance(value, str):
-                continue
-
-            if row_type == "meta":
-                if key in META_ALLOWLIST:
-                    doc.__dict__[key] = value
-                else:
-                    # Enforce custom meta field count limit
-                    if len(doc.custom_meta) >= MAX_META_FIELDS:
-                        continue
-                    doc.custom_meta[key] = value
-            elif row_type == "section":
-                doc.add_section(key, value)
+            if row_type == "section":
+                add_section(key, value)
+            elif row_type == "meta":
+                if key in allowlist:
+                    fields[key] = value
+                # Enforce custom meta field count limit
+                elif len(custom_meta) < MAX_META_FIELDS:
+                    custom_meta[key] = value
 
         return doc
     finally:
@@ -194,21 +278,25 @@ def to_txt(doc: PFMDocument) -> str:
     Just the content sections, separated by section names as headers.
     Optimized for human reading - strips all metadata overhead.
     """
-    parts = []
+    buf = io.StringIO()
+    w = buf.write
+    sep = ""  # blank line between blocks
 
     # Compact meta header
     meta = doc.get_meta_dict()
     if meta:
-        meta_line = " | ".join(f"{k}={v}" for k, v in meta.items() if k != "checksum")
-        parts.append(f"[{meta_line}]")
-        parts.append("")
+        # A list, not a generator: join() would build one from it anyway
+        pairs = [f"{k}={v}" for k, v in meta.items() if k != "checksum"]
+        w(f"[{' | '.join(pairs)}]\n")
+        sep = "\n"
 
     for section in doc.sections:
-        parts.append(f"=== {section.name.upper()} ===")
-        parts.append(section.content)
-        parts.append("")
+        w(f"{sep}=== {section.name.upper()} ===\n")
+        w(section.content)
+        w("\n")
+        sep = "\n"
 
-    return "\n".join(parts)
+    return buf.getvalue()
 
 
 def from_txt(txt_str: str, agent: str = "", model: str = "") -> PFMDocument:
@@ -225,6 +313,16 @@ def from_txt(txt_str: str, agent: str = "", model: str = "") -> PFMDocument:
 # Markdown
 # =============================================================================
 
+# Anything but a letter, digit, '_' or '-'. \w matches exactly the characters
+# str.isalnum() accepts, plus '_', so non-ASCII letters are kept.
+_YAML_KEY_UNSAFE_RE = re.compile(r"[^\w-]")
+
+# Frontmatter "key: value" split at the first ": " (same as str.split(": ", 1))
+_FM_LINE_RE = re.compile(r"(.*?): (.*)", re.DOTALL)
+# Characters dropped when normalizing a ## header into a section name
+_SECTION_NAME_UNSAFE_RE = re.compile(r"[^a-z0-9_-]+")
+
+
 def to_markdown(doc: PFMDocument) -> str:
     """
     Convert PFM document to Markdown.
@@ -232,29 +330,31 @@ def to_markdown(doc: PFMDocument) -> str:
 
     Security: Sanitizes meta keys and values to prevent YAML frontmatter injection.
     """
-    parts = []
+    buf = io.StringIO()
+    w = buf.write
+    sep = ""  # blank line between blocks
 
     # Frontmatter
     meta = doc.get_meta_dict()
     if meta:
-        parts.append("---")
+        w("---\n")
         for key, val in meta.items():
             # Sanitize key: remove colons and control characters
-            safe_key = "".join(c if c.isalnum() or c in "-_" else "_" for c in key)
+            safe_key = _YAML_KEY_UNSAFE_RE.sub("_", key)
             # Sanitize value: replace newlines, escape frontmatter delimiters
             safe_val = val.replace("\n", " ").replace("---", "\\---")
-            parts.append(f"{safe_key}: {safe_val}")
-        parts.append("---")
-        parts.append("")
+            w(f"{safe_key}: {safe_val}\n")
+        w("---\n")
+        sep = "\n"
 
     # Sections as headers
     for section in doc.sections:
-        parts.append(f"## {section.name}")
-        parts.append("")
-        parts.append(section.content)
-        parts.append("")
+        w(f"{sep}## {section.name}\n\n")
+        w(section.content)
+        w("\n")
+        sep = "\n"
 
-    return "\n".join(parts)
+    return buf.getvalue()
 
 
 def from_markdown(md_str: str) -> PFMDocument:
@@ -268,68 +368,77 @@ def from_markdown(md_str: str) -> PFMDocument:
     from pfm.spec import MAX_META_FIELDS
 
     doc = PFMDocument()
-    lines = md_str.split("\n")
-    i = 0
+    n = len(md_str)
+    fm_match = _FM_LINE_RE.fullmatch
+
+    # Lines are scanned in place with str.find; the document is never
+    # split into a list of line strings.
+    end = md_str.find("\n")
+    if end == -1:
+        end = n
+    pos = 0
 
     # Parse frontmatter
-    if lines and lines[0].strip() == "---":
-        i = 1
-        while i < len(lines) and lines[i].strip() != "---":
-            line = lines[i].strip()
-            if ": " in line:
-                key, val = line.split(": ", 1)
-                key = key.strip()
-                val = val.strip()
+    if md_str[:end].strip() == "---":
+        pos = end + 1
+        while pos <= n:
+            end = md_str.find("\n", pos)
+            if end == -1:
+                end = n
+            line = md_str[pos:end].strip()
+            pos = end + 1
+            if line == "---":
+                break  # Closing ---
+            m = fm_match(line)
+            if m is not None:
+                key = m.group(1).strip()
+                val = m.group(2).strip()
                 if key in META_ALLOWLIST:
                     doc.__dict__[key] = val
                 else:
                     # Enforce custom meta field count limit
                     if len(doc.custom_meta) < MAX_META_FIELDS:
                         doc.custom_meta[key] = val
-            i += 1
-        i += 1  # Skip closing ---
 
-    # Parse sections (## headers)
+    # Parse sections (## headers). A block's body runs from the line after
+    # its header (or the end of frontmatter) up to the next header line.
     current_section: str | None = None
-    section_lines: list[str] = []
-    content_before_sections: list[str] = []
-
-    while i < len(lines):
-        line = lines[i]
-
-        if line.startswith("## "):
-            # Flush previous section
-            if current_section:
-                doc.add_section(current_section, "\n".join(section_lines).strip())
-            else:
-                # Only add pre-section content if it's non-empty
-                pre_content = "\n".join(content_before_sections).strip()
-                if pre_content:
-                    doc.add_section("content", pre_content)
-
-            # Normalize section name: lowercase, replace spaces with hyphens,
-            # strip non-alphanumeric chars for PFM section name compatibility
-            raw_name = line[3:].strip()
-            normalized = raw_name.lower().replace(" ", "-")
-            normalized = "".join(
-                c for c in normalized if c in "abcdefghijklmnopqrstuvwxyz0123456789_-"
-            )
-            current_section = normalized or "content"
-            section_lines = []
-        elif current_section is None:
-            content_before_sections.append(line)
-        else:
-            section_lines.append(line)
-
-        i += 1
+    block_start = pos
+
+    while pos < n:
+        if not md_str.startswith("## ", pos):
+            # Jump straight to the next line that starts a header
+            pos = md_str.find("\n## ", pos)
+            if pos == -1:
+                break
+            pos += 1
+            continue
+
+        body = md_str[block_start:pos - 1].strip() if pos > block_start else ""
+        if current_section:
+            doc.add_section(current_section, body)
+        elif body:
+            # Only add pre-section content if it's non-empty
+            doc.add_section("content", body)
+
+        end = md_str.find("\n", pos)
+        if end == -1:
+            end = n
+        # Normalize section name: lowercase, replace spaces with hyphens,
+        # strip non-alphanumeric chars for PFM section name compatibility
+        raw_name = md_str[pos + 3:end].strip()
+        normalized = _SECTION_NAME_UNSAFE_RE.sub(
+            "", raw_name.lower().replace(" ", "-")
+        )
+        current_section = normalized or "content"
+        pos = block_start = end + 1
 
     # Flush last section
+    body = md_str[block_start:].strip()
     if current_section:
-        doc.add_section(current_section, "\n".join(section_lines).strip())
-    else:
-        pre_content = "\n".join(content_before_sections).strip()
-        if pre_content:
-            doc.add_section("content", pre_content)
+        doc.add_section(current_section, body)
+    elif body:
+        doc.add_section("content", body)
 
     # If no sections at all, treat everything as content
     if not doc.sections:
@@ -358,25 +467,37 @@ CONVERTERS_FROM = {
     "markdown": from_markdown,
 }
 
+# Built once for the error paths below
+_TO_SUPPORTED = str(list(CONVERTERS_TO))
+_FROM_SUPPORTED = str(list(CONVERTERS_FROM))
+
 
 def convert_to(doc: PFMDocument, fmt: str) -> str:
     """Convert a PFM document to the specified format."""
     converter = CONVERTERS_TO.get(fmt.lower())
     if converter is None:
-        raise ValueError(f"Unknown format: {fmt}. Supported: {list(CONVERTERS_TO.keys())}")
+        raise ValueError(f"Unknown format: {fmt}. Supported: {_TO_SUPPORTED}")
     return converter(doc)
 
 
-def convert_from(data: str, fmt: str, **kwargs) -> PFMDocument:
+def convert_to_bytes(doc: PFMDocument, fmt: str) -> bytes:
+    """Like convert_to(), but returns UTF-8 bytes ready to write out."""
+    if fmt.lower() == "json":
+        return to_json_bytes(doc)
+    return convert_to(doc, fmt).encode("utf-8")
+
+
+def convert_from(data: str | bytes, fmt: str, **kwargs) -> PFMDocument:
     """Create a PFM document from data in the specified format.
 
-    Only 'txt' format accepts extra kwargs (agent=, model=).
+    'json' also accepts UTF-8 bytes, which are parsed without first being
+    decoded to a str. Only 'txt' format accepts extra kwargs (agent=, model=).
     Other formats ignore unknown kwargs to prevent TypeError.
     """
     converter = CONVERTERS_FROM.get(fmt.lower())
     if converter is None:
-        raise ValueError(f"Unknown format: {fmt}. Supported: {list(CONVERTERS_FROM.keys())}")
+        raise ValueError(f"Unknown format: {fmt}. Supported: {_FROM_SUPPORTED}")
     # Only from_txt accepts kwargs; strip them for other converters
-    if fmt.lower() == "txt":
+    if converter is from_txt:
         return converter(data, **kwargs)
     return converter(data)
@@ -4,7 +4,10 @@ PFM Document - In-memory representation of a .pfm file.
 
 from __future__ import annotations
 
+import codecs
 import hashlib
+import mmap
+import os
 import uuid
 from datetime import datetime, timezone
 from dataclasses import dataclass, field
@@ -15,14 +18,32 @@ from pfm.spec import (
     ALLOWED_SECTION_NAME_CHARS,
 )
 
+# Standard meta fields, in the order they are emitted
+_STANDARD_META_KEYS = ("id", "agent", "model", "created", "checksum", "parent", "tags", "version")
 
-@dataclass
+
+@dataclass(slots=True)
 class PFMSection:
     """A single section in a PFM document."""
     name: str
     content: str
     offset: int = 0   # byte offset from file start (populated on read/write)
     length: int = 0    # byte length of content (populated on read/write)
+    # UTF-8 encoding of `content`, cached by encoded()
+    _encoded: bytes = field(default=b"", init=False, repr=False, compare=False)
+    _encoded_src: str | None = field(default=None, init=False, repr=False, compare=False)
+
+    def encoded(self) -> bytes:
+        """Return content as UTF-8 bytes, encoding at most once.
+
+        The cache is keyed on the identity of the content string, so
+        assigning a new value to `content` invalidates it.
+        """
+        content = self.content
+        if self._encoded_src is not content:
+            self._encoded = content.encode("utf-8")
+            self._encoded_src = content
+        return self._encoded
 
 
 @dataclass
@@ -81,9 +102,12 @@ class PFMDocument:
     # Reserved names that cannot be used as content section names
     _RESERVED_SECTION_NAMES = frozenset({"meta", "index", "index-trailing"})
 
-    def add_section(self, name: str, content: str) -> PFMSection:
+    def add_section(self, name: str, content: str | bytes) -> PFMSection:
         """Add a named section. Returns the section for chaining.
 
+        Content may be given as UTF-8 bytes; they are decoded once and kept
+        as the section's cached encoding, so writing never re-encodes them.
+
         PFM-015 fix: Validates section name format and enforces limits.
         PFM-014 fix: Enforces maximum section count.
         """
@@ -95,7 +119,7 @@ class PFMDocument:
                 f"Section name too long: {len(name)} chars "
                 f"(max {MAX_SECTION_NAME_LENGTH})"
             )
-        if not all(c in ALLOWED_SECTION_NAME_CHARS for c in name):
+        if not ALLOWED_SECTION_NAME_CHARS.issuperset(name):
             raise ValueError(
                 f"Invalid section name: {name!r}. "
                 f"Only lowercase alphanumeric, hyphens, and underscores allowed."
@@ -109,10 +133,36 @@ class PFMDocument:
                 f"Maximum section count exceeded: {MAX_SECTIONS}"
             )
 
-        section = PFMSection(name=name, content=content)
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            raw = bytes(content)
+            section = PFMSection(name=name, content=raw.decode("utf-8"))
+            section._encoded = raw
+            section._encoded_src = section.content
+        else:
+            section = PFMSection(name=name, content=content)
         self.sections.append(section)
         return section
 
+    def add_section_from_file(
+        self, name: str, path: str | os.PathLike[str], encoding: str = "utf-8"
+    ) -> PFMSection:
+        """Add a section whose content is read from a file.
+
+        The file is memory-mapped instead of read through a buffered stream.
+        UTF-8 input is copied out of the mapping once and kept as the
+        section's cached encoding (never re-encoded on write); any other
+        encoding is decoded straight from the mapping.
+        """
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return self.add_section(name, "")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if codecs.lookup(encoding).name == "utf-8":
+                    content: str | bytes = mapped[:]
+                else:
+                    content = str(mapped, encoding)
+        return self.add_section(name, content)
+
     def get_section(self, name: str) -> PFMSection | None:
         """Get first section by name. O(n) scan - use reader for O(1) indexed access."""
         for s in self.sections:
@@ -128,16 +178,13 @@ class PFMDocument:
         """Compute SHA-256 checksum of all section contents combined."""
         h = hashlib.sha256()
         for section in self.sections:
-            h.update(section.content.encode("utf-8"))
+            h.update(section.encoded())
         return h.hexdigest()
 
     def get_meta_dict(self) -> dict[str, str]:
         """Return all metadata as a flat dict."""
-        meta = {}
-        for key in ("id", "agent", "model", "created", "checksum", "parent", "tags", "version"):
-            val = getattr(self, key, "")
-            if val:
-                meta[key] = val
+        fields = self.__dict__
+        meta = {key: fields[key] for key in _STANDARD_META_KEYS if fields[key]}
         meta.update(self.custom_meta)
         return meta
 
@@ -7,17 +7,26 @@ Converts .pfm conversation files into fine-tuning JSONL formats:
   - ShareGPT (conversations array with human/gpt roles)
 
 Usage:
-    from pfm.export import export_documents
+    from pfm.export import write_jsonl
 
     docs = [PFMReader.read(p) for p in pfm_paths]
-    lines, total_turns = export_documents(docs, format="openai")
+    total_turns = write_jsonl(docs, "training.jsonl", fmt="openai")
+
+JSON is encoded with orjson when it is installed (pip install "get-pfm[fast]")
+and with the stdlib otherwise; both write the same compact JSONL ("," and
+":" separators, no spaces).
 """
 
 from __future__ import annotations
 
+import functools
 import json
+import os
+import stat
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Sequence
+from typing import BinaryIO, Sequence
 
 from pfm.document import PFMDocument
 from pfm.reader import PFMReader
@@ -27,6 +36,16 @@ from pfm.reader import PFMReader
 # Turn parser
 # ---------------------------------------------------------------------------
 
+# Block prefixes that start a new turn. Their first two characters are
+# distinct, so those pick the (role, prefix length) once a prefix matched.
+_ROLE_PREFIXES = ("User:", "Assistant:", "Agent:")
+_ROLE_BY_HEAD = {
+    "Us": ("user", len("User:")),
+    "As": ("assistant", len("Assistant:")),
+    "Ag": ("assistant", len("Agent:")),
+}
+
+
 def parse_turns(text: str) -> list[tuple[str, str]]:
     """Parse a chain string into (role, content) turn pairs.
 
@@ -39,40 +58,28 @@ def parse_turns(text: str) -> list[tuple[str, str]]:
     if not text or not text.strip():
         return turns
 
-    blocks = text.split("\n\n")
     current_role: str | None = None
     current_lines: list[str] = []
 
-    for block in blocks:
+    for block in text.split("\n\n"):
         stripped = block.strip()
         if not stripped:
             continue
 
-        # Detect role prefix
-        if stripped.startswith("User:"):
+        # Detect role prefix (one startswith call against all three)
+        if stripped.startswith(_ROLE_PREFIXES):
             # Flush previous
             if current_role is not None:
                 turns.append((current_role, "\n\n".join(current_lines).strip()))
-            current_role = "user"
-            current_lines = [stripped[len("User:"):].strip()]
-        elif stripped.startswith("Assistant:"):
-            if current_role is not None:
-                turns.append((current_role, "\n\n".join(current_lines).strip()))
-            current_role = "assistant"
-            current_lines = [stripped[len("Assistant:"):].strip()]
-        elif stripped.startswith("Agent:"):
-            if current_role is not None:
-                turns.append((current_role, "\n\n".join(current_lines).strip()))
-            current_role = "assistant"
-            current_lines = [stripped[len("Agent:"):].strip()]
-        else:
+            current_role, skip = _ROLE_BY_HEAD[stripped[:2]]
+            current_lines = [stripped[skip:].strip()]
+        elif current_role is not None:
             # Continuation of current block
-            if current_role is not None:
-                current_lines.append(stripped)
-            else:
-                # No role prefix yet — treat as assistant content
-                current_role = "assistant"
-                current_lines = [stripped]
+            current_lines.append(stripped)
+        else:
+            # No role prefix yet — treat as assistant content
+            current_role = "assistant"
+            current_lines = [stripped]
 
     # Flush last turn
     if current_role is not None:
@@ -97,68 +104,118 @@ def _extract_metadata(doc: PFMDocument) -> dict[str, str]:
 
 
 # ---------------------------------------------------------------------------
-# Format exporters — each returns (json_line, turn_count)
+# JSON encoding — orjson when installed, stdlib otherwise (same bytes)
 # ---------------------------------------------------------------------------
 
-def _export_openai(doc: PFMDocument, turns: list[tuple[str, str]], meta: dict[str, str]) -> tuple[str, int]:
+# Compact separators, matching orjson; also the fallback for the strings
+# orjson refuses (lone surrogates)
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+try:
+    import orjson
+
+    def _dumps(obj: object) -> str:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except orjson.JSONEncodeError:
+            return _encoder.encode(obj)
+
+    def _dumps_line(obj: object) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+        except orjson.JSONEncodeError:
+            return (_encoder.encode(obj) + "\n").encode("utf-8")
+except ImportError:
+    _dumps = _encoder.encode
+
+    def _dumps_line(obj: object) -> bytes:
+        return (_encoder.encode(obj) + "\n").encode("utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Format exporters — each returns (records, turn_count)
+# ---------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=256)
+def _system_message(platform: str, model: str) -> str:
+    # Batches usually share a handful of platform/model pairs
+    return f"Conversation from {platform} using {model}"
+
+
+def _export_openai(doc: PFMDocument, turns: list[tuple[str, str]], meta: dict[str, str]) -> tuple[list[dict], int]:
     """Export one document as OpenAI fine-tuning format."""
-    platform = meta.get("platform", "unknown")
-    model = meta.get("model", "unknown")
-    system_msg = f"Conversation from {platform} using {model}"
+    system_msg = _system_message(meta.get("platform", "unknown"), meta.get("model", "unknown"))
 
     messages: list[dict[str, str]] = [{"role": "system", "content": system_msg}]
-    for role, content in turns:
-        messages.append({"role": role, "content": content})
+    messages += [{"role": role, "content": content} for role, content in turns]
 
-    return json.dumps({"messages": messages}, ensure_ascii=False), len(turns)
+    return [{"messages": messages}], len(turns)
 
 
-def _export_alpaca(doc: PFMDocument, turns: list[tuple[str, str]], meta: dict[str, str]) -> tuple[list[str], int]:
-    """Export one document as Alpaca format (one line per user/assistant pair)."""
-    lines: list[str] = []
-    i = 0
-    while i < len(turns):
-        role, content = turns[i]
-        if role == "user" and i + 1 < len(turns) and turns[i + 1][0] == "assistant":
-            entry = {
-                "instruction": content,
+def _export_alpaca(doc: PFMDocument, turns: list[tuple[str, str]], meta: dict[str, str]) -> tuple[list[dict], int]:
+    """Export one document as Alpaca format (one record per user/assistant pair)."""
+    records: list[dict] = []
+    pending: str | None = None  # user turn still waiting for its reply
+    for role, content in turns:
+        if pending is not None and role == "assistant":
+            entry: dict = {
+                "instruction": pending,
                 "input": "",
-                "output": turns[i + 1][1],
+                "output": content,
             }
             if meta:
                 entry["metadata"] = meta
-            lines.append(json.dumps(entry, ensure_ascii=False))
-            i += 2
+            records.append(entry)
+            pending = None
         else:
-            i += 1
-    return lines, len(lines)
+            pending = content if role == "user" else None
+    return records, len(records)
 
 
-def _export_sharegpt(doc: PFMDocument, turns: list[tuple[str, str]], meta: dict[str, str]) -> tuple[str, int]:
+def _export_sharegpt(doc: PFMDocument, turns: list[tuple[str, str]], meta: dict[str, str]) -> tuple[list[dict], int]:
     """Export one document as ShareGPT format."""
-    conversations: list[dict[str, str]] = []
-    for role, content in turns:
-        gpt_role = "human" if role == "user" else "gpt"
-        conversations.append({"from": gpt_role, "value": content})
+    conversations: list[dict[str, str]] = [
+        {"from": "human" if role == "user" else "gpt", "value": content}
+        for role, content in turns
+    ]
 
-    return json.dumps({"conversations": conversations}, ensure_ascii=False), len(turns)
+    return [{"conversations": conversations}], len(turns)
+
+
+_EXPORTERS = {
+    "openai": _export_openai,
+    "alpaca": _export_alpaca,
+    "sharegpt": _export_sharegpt,
+}
 
 
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
-def export_document(doc: PFMDocument, fmt: str = "openai") -> tuple[list[str], int]:
-    """Export a single PFM document to JSONL lines.
+def export_records(doc: PFMDocument, fmt: str = "openai") -> tuple[list[dict], int]:
+    """Export a single PFM document to JSON-serializable records.
 
-    Returns (lines, turn_count).
+    Returns (records, turn_count).
     """
-    # Prefer chain section; fall back to content
-    chain = doc.chain
+    exporter = _EXPORTERS.get(fmt)
+    if exporter is None:
+        raise ValueError(f"Unknown export format: {fmt!r}. Use: openai, alpaca, sharegpt")
+
+    # Prefer chain section; fall back to content. One pass over the
+    # sections picks up the first of each (same as doc.chain/doc.content).
+    chain = content = None
+    for s in doc.sections:
+        if s.name == "chain":
+            if chain is None:
+                chain = s.content
+                if chain:
+                    break  # content is only needed when chain is empty
+        elif s.name == "content" and content is None:
+            content = s.content
     if chain:
         turns = parse_turns(chain)
     else:
-        content = doc.content or ""
         if content:
             turns = [("assistant", content)]
         else:
@@ -167,19 +224,16 @@ def export_document(doc: PFMDocument, fmt: str = "openai") -> tuple[list[str], i
     if not turns:
         return [], 0
 
-    meta = _extract_metadata(doc)
-
-    if fmt == "openai":
-        line, count = _export_openai(doc, turns, meta)
-        return [line], count
-    elif fmt == "alpaca":
-        lines, count = _export_alpaca(doc, turns, meta)
-        return lines, count
-    elif fmt == "sharegpt":
-        line, count = _export_sharegpt(doc, turns, meta)
-        return [line], count
-    else:
-        raise ValueError(f"Unknown export format: {fmt!r}. Use: openai, alpaca, sharegpt")
+    return exporter(doc, turns, _extract_metadata(doc))
+
+
+def export_document(doc: PFMDocument, fmt: str = "openai") -> tuple[list[str], int]:
+    """Export a single PFM document to JSONL lines.
+
+    Returns (lines, turn_count).
+    """
+    records, count = export_records(doc, fmt)
+    return [_dumps(r) for r in records], count
 
 
 def export_documents(docs: Sequence[PFMDocument], fmt: str = "openai") -> tuple[list[str], int]:
@@ -193,17 +247,96 @@ def export_documents(docs: Sequence[PFMDocument], fmt: str = "openai") -> tuple[
     return all_lines, total_turns
 
 
-def load_pfm_paths(path: str) -> list[Path]:
+def write_jsonl(
+    docs: Sequence[PFMDocument], path: str | BinaryIO, fmt: str = "openai"
+) -> int:
+    """Stream documents to a JSONL file, one record per line.
+
+    ``path`` may also be an open binary file object (e.g.
+    ``sys.stdout.buffer``), which is written to but not closed. Paths are
+    opened with a 1 MiB buffer. Records are encoded and written one at a
+    time, so the whole export never exists in memory at once. Returns
+    total_turns.
+    """
+    if hasattr(path, "write"):
+        return _write_records(docs, path, fmt)
+    with open(path, "wb", buffering=1 << 20) as f:
+        return _write_records(docs, f, fmt)
+
+
+def _write_records(docs: Sequence[PFMDocument], f: BinaryIO, fmt: str) -> int:
+    total_turns = 0
+    write = f.write
+    for doc in docs:
+        records, count = export_records(doc, fmt)
+        for record in records:
+            write(_dumps_line(record))
+        total_turns += count
+    return total_turns
+
+
+def load_pfm_paths(path: str) -> list[str]:
     """Resolve a path to a list of .pfm file paths.
 
     If path is a file, returns [path].
-    If path is a directory, returns all .pfm files in it (non-recursive).
+    If path is a directory, returns all .pfm files in it (non-recursive),
+    sorted. Uses os.scandir so entry paths are already strings and file
+    type checks come from the directory listing; the argument itself is
+    stat'ed once.
     """
-    p = Path(path)
-    if p.is_file():
-        return [p]
-    elif p.is_dir():
-        files = sorted(p.glob("*.pfm"))
-        return files
-    else:
-        raise FileNotFoundError(f"Path not found: {path}")
+    try:
+        mode = os.stat(path).st_mode
+    except OSError:
+        mode = 0
+    if stat.S_ISREG(mode):
+        return [path]
+    if stat.S_ISDIR(mode):
+        with os.scandir(path) as entries:
+            return sorted(
+                entry.path for entry in entries
+                if entry.name.endswith(".pfm") and entry.is_file()
+            )
+    raise FileNotFoundError(f"Path not found: {path}")
+
+
+def _read_one(path: str | Path) -> PFMDocument | Exception:
+    try:
+        return PFMReader.read(path)
+    except Exception as e:
+        return e
+
+
+# With processes=True, above this many files parsing, not I/O, dominates:
+# use processes so parsing runs in parallel instead of being serialized
+# by the GIL.
+_PROCESS_POOL_MIN_FILES = 64
+
+
+def load_documents(
+    paths: Sequence[str | Path], processes: bool = False,
+) -> list[tuple[str | Path, PFMDocument | Exception]]:
+    """Read .pfm files concurrently, preserving input order.
+
+    Each entry is (path, document) on success or (path, exception) on
+    failure, so callers decide how to report bad files. Files are read on
+    threads, which let file I/O for one document overlap parsing of
+    another.
+
+    processes=True lets batches over _PROCESS_POOL_MIN_FILES use a process
+    pool instead. Only pass it from an entry point that is safe to
+    re-import in spawned workers (guarded by ``if __name__ == "__main__"``),
+    such as the ``pfm export`` command.
+    """
+    if len(paths) <= 1:
+        return [(p, _read_one(p)) for p in paths]
+    cpus = os.cpu_count() or 1
+    if processes and len(paths) > _PROCESS_POOL_MIN_FILES and cpus > 1:
+        chunksize = max(1, len(paths) // (cpus * 4))
+        try:
+            with ProcessPoolExecutor() as pool:
+                return list(zip(paths, pool.map(_read_one, paths, chunksize=chunksize)))
+        except (OSError, BrokenProcessPool):
+            pass  # no process support here (sandbox, missing sem_open); use threads
+    workers = min(32, cpus * 4, len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(zip(paths, pool.map(_read_one, paths)))
@@ -3,7 +3,7 @@ PFM Reader - Fast parser for .pfm files.
 
 Speed features:
   - Magic byte check in first 64 bytes (instant file identification)
-  - Index-based O(1) section access via file seek (true lazy reading)
+  - Index-based O(1) section access via a read-only mmap (true lazy reading)
   - Only the header (magic + meta + index) is read on open
   - Section content is read on demand — never loads the full file into memory
 
@@ -19,27 +19,48 @@ from __future__ import annotations
 import builtins
 import hashlib
 import hmac as _hmac
+import io
+import mmap
+import os
+from collections import OrderedDict
 from pathlib import Path
 from typing import BinaryIO
 
 from pfm.spec import (
-    MAGIC, EOF_MARKER, SECTION_PREFIX, MAX_MAGIC_SCAN_BYTES,
+    MAGIC, EOF_MARKER, SECTION_PREFIX,
     META_ALLOWLIST, MAX_FILE_SIZE, MAX_META_FIELDS, SUPPORTED_FORMAT_VERSIONS,
     unescape_content,
 )
 from pfm.document import PFMDocument, PFMSection
 
+_MAGIC_BYTES = MAGIC.encode("utf-8")
+_EOF_MARKER_BYTES = EOF_MARKER.encode("utf-8")
+_TRAILING_INDEX_HEADER = f"{SECTION_PREFIX}index-trailing".encode("utf-8")
+
+# Decoded sections kept per PFMReaderHandle
+_SECTION_CACHE_SIZE = 64
+
+
+class BadMagicError(ValueError):
+    """Raised when a file does not start with the PFM magic bytes."""
+
 
 class PFMIndex:
     """Parsed index for O(1) section access."""
 
+    __slots__ = ("entries", "_names")
+
     def __init__(self) -> None:
         self.entries: dict[str, list[tuple[int, int]]] = {}  # name -> [(offset, length), ...]
+        self._names: list[str] | None = None  # section_names, built on demand
 
     def add(self, name: str, offset: int, length: int) -> None:
-        if name not in self.entries:
-            self.entries[name] = []
-        self.entries[name].append((offset, length))
+        entries = self.entries.get(name)
+        if entries is None:
+            self.entries[name] = [(offset, length)]
+            self._names = None
+        else:
+            entries.append((offset, length))
 
     def get(self, name: str) -> tuple[int, int] | None:
         """Get first entry for a section name. Returns (offset, length) or None."""
@@ -54,7 +75,15 @@ class PFMIndex:
 
     @property
     def section_names(self) -> list[str]:
-        return list(self.entries.keys())
+        """Distinct section names in index order.
+
+        The list is cached until a new name is added; copy it before
+        modifying.
+        """
+        names = self._names
+        if names is None:
+            names = self._names = list(self.entries)
+        return names
 
 
 class PFMReader:
@@ -65,7 +94,7 @@ class PFMReader:
         # Full parse (loads entire file)
         doc = PFMReader.read("file.pfm")
 
-        # Indexed access (lazy — only reads header on open, seeks for sections)
+        # Indexed access (lazy — only reads header on open, maps sections on demand)
         with PFMReader.open("file.pfm") as reader:
             content = reader.get_section("content")
     """
@@ -80,28 +109,35 @@ class PFMReader:
 
     @staticmethod
     def is_pfm(path: str | Path) -> bool:
-        """Fast check if a file is PFM format. Reads only first 64 bytes."""
-        with open(path, "rb") as f:
-            head = f.read(MAX_MAGIC_SCAN_BYTES)
-        return head.startswith(MAGIC.encode("utf-8"))
+        """Fast check if a file is PFM format. Reads only the magic bytes.
+
+        Uses a raw os.open/os.read pair: no buffered file object is built.
+        """
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            head = os.read(fd, len(_MAGIC_BYTES))
+        finally:
+            os.close(fd)
+        return head == _MAGIC_BYTES
 
     @staticmethod
     def is_pfm_bytes(data: bytes) -> bool:
         """Fast check if bytes are PFM format."""
-        return data[:len(MAGIC)].startswith(MAGIC.encode("utf-8"))
+        return data.startswith(_MAGIC_BYTES)
 
     @classmethod
     def read(cls, path: str | Path, max_size: int = MAX_FILE_SIZE) -> PFMDocument:
         """Fully parse a .pfm file into a PFMDocument."""
-        path = Path(path)
-        file_size = path.stat().st_size
-        if file_size > max_size:
-            raise ValueError(
-                f"File size {file_size} exceeds maximum {max_size} bytes. "
-                f"Pass max_size= to override."
-            )
-        with open(path, "rb") as f:
-            data = f.read()
+        # Unbuffered: FileIO.readall() sizes its result from fstat and reads
+        # straight into it, with no BufferedReader buffer in between
+        with open(path, "rb", buffering=0) as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size > max_size:
+                raise ValueError(
+                    f"File size {file_size} exceeds maximum {max_size} bytes. "
+                    f"Pass max_size= to override."
+                )
+            data = f.readall()
         return cls.parse(data)
 
     @classmethod
@@ -112,60 +148,82 @@ class PFMReader:
                 f"Input size {len(data)} exceeds maximum {max_size} bytes. "
                 f"Pass max_size= to override."
             )
+        # Normalize CRLF/CR to LF to handle Windows line endings. The check
+        # runs on the bytes, where memchr finds (or rules out) a CR fastest.
+        if b"\r" in data:
+            data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
         text = data.decode("utf-8")
-        # Normalize CRLF/CR to LF to handle Windows line endings
-        text = text.replace("\r\n", "\n").replace("\r", "\n")
-        lines = text.split("\n")
+        n = len(text)
 
         doc = PFMDocument()
+        fields = doc.__dict__  # allowlisted meta keys are read and set here
+        skip_sections = ("meta", "index", "index-trailing")
         current_section: str | None = None
-        section_lines: list[str] = []
+        collecting = False  # current_section holds content
+        # Content is sliced out of `text` in runs of consecutive lines
+        # rather than split into one str per line: `seg_start` is where the
+        # current run began and `parts` holds runs already cut off by a
+        # dropped magic line (normally there are none).
+        parts: list[str] = []
+        seg_start = 0
         in_meta = False
-        in_index = False
         hit_eof = False
 
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-
-            # Magic line (handles both "#!PFM/1.0" and "#!PFM/1.0:STREAM")
-            if line.startswith(MAGIC):
-                version_part = line.split("/", 1)[1] if "/" in line else "1.0"
-                parsed_version = version_part.split(":")[0]  # Strip :STREAM flag
-                if parsed_version not in SUPPORTED_FORMAT_VERSIONS:
-                    raise ValueError(
-                        f"Unsupported PFM format version: {parsed_version!r}. "
-                        f"Supported: {', '.join(sorted(SUPPORTED_FORMAT_VERSIONS))}"
-                    )
-                doc.format_version = parsed_version
-                i += 1
-                continue
-
-            # EOF marker (only match unescaped)
-            if line.startswith(EOF_MARKER):
-                hit_eof = True
-                break
-
-            # Section header (only match unescaped — escaped lines start with \#)
-            if line.startswith(SECTION_PREFIX):
-                # Flush previous section
-                skip_sections = ("meta", "index", "index-trailing")
-                if current_section and current_section not in skip_sections:
-                    content = "\n".join(section_lines)
-                    # Unescape content lines
-                    content = unescape_content(content)
-                    doc.add_section(current_section, content)
+        pos = 0  # start of the current line
+        while pos <= n:
+            # Marker lines all start with '#'
+            if text.startswith("#", pos) and (
+                text.startswith(SECTION_PREFIX, pos)
+                or text.startswith(MAGIC, pos)
+                or text.startswith(EOF_MARKER, pos)
+            ):
+                end = text.find("\n", pos)
+                if end == -1:
+                    end = n
+                line = text[pos:end]
+
+                # Close the run of content lines before this marker
+                if collecting and pos > seg_start:
+                    parts.append(text[seg_start:pos - 1])
+
+                # Magic line (handles both "#!PFM/1.0" and "#!PFM/1.0:STREAM")
+                if line.startswith(MAGIC):
+                    version_part = line.split("/", 1)[1] if "/" in line else "1.0"
+                    parsed_version = version_part.split(":")[0]  # Strip :STREAM flag
+                    if parsed_version not in SUPPORTED_FORMAT_VERSIONS:
+                        raise ValueError(
+                            f"Unsupported PFM format version: {parsed_version!r}. "
+                            f"Supported: {', '.join(sorted(SUPPORTED_FORMAT_VERSIONS))}"
+                        )
+                    doc.format_version = parsed_version
+
+                # EOF marker (only match unescaped)
+                elif line.startswith(EOF_MARKER):
+                    hit_eof = True
+                    break
 
-                section_name = line[len(SECTION_PREFIX):]
-                current_section = section_name
-                section_lines = []
-                in_meta = section_name == "meta"
-                in_index = section_name in ("index", "index-trailing")
-                i += 1
+                # Section header (only match unescaped — escaped lines start with \#)
+                else:
+                    # Flush previous section
+                    if collecting:
+                        content = unescape_content("\n".join(parts))
+                        doc.add_section(current_section, content)
+                    section_name = line[len(SECTION_PREFIX):]
+                    current_section = section_name
+                    collecting = bool(section_name) and section_name not in skip_sections
+                    parts = []
+                    in_meta = section_name == "meta"
+
+                pos = seg_start = end + 1
                 continue
 
             # Meta key-value pairs (strict allowlist — PFM-002 fix)
             if in_meta:
+                end = text.find("\n", pos)
+                if end == -1:
+                    end = n
+                line = text[pos:end]
+                pos = end + 1
                 if ": " in line:
                     key, val = line.split(": ", 1)
                     key = key.strip()
@@ -173,8 +231,8 @@ class PFMReader:
                     if key in META_ALLOWLIST:
                         # First-wins: prevent duplicate meta key override
                         # Use explicit dict-style access to avoid setattr risks
-                        if not getattr(doc, key, ""):
-                            doc.__dict__[key] = val
+                        if not fields[key]:
+                            fields[key] = val
                     else:
                         # First-wins: only set if key not already present
                         if key not in doc.custom_meta:
@@ -184,23 +242,22 @@ class PFMReader:
                                     f"Maximum custom meta fields exceeded: {MAX_META_FIELDS}"
                                 )
                             doc.custom_meta[key] = val
-                i += 1
                 continue
 
-            # Index entries (skipped in full parse — index is only used for lazy access)
-            if in_index:
-                i += 1
-                continue
-
-            # Section content (raw — unescaping happens on flush)
-            if current_section:
-                section_lines.append(line)
-
-            i += 1
+            # Content, index entries (skipped in full parse — the index is only
+            # used for lazy access) and stray lines: nothing to do per line,
+            # so jump to the next line that could be a marker.
+            nxt = text.find("\n#", pos)
+            if nxt == -1:
+                pos = n + 1
+                break
+            pos = nxt + 1
 
         # Flush last section
-        if current_section and current_section not in ("meta", "index", "index-trailing"):
-            content = "\n".join(section_lines)
+        if collecting:
+            if not hit_eof and seg_start <= n:
+                parts.append(text[seg_start:])
+            content = "\n".join(parts)
             # Strip trailing newline only for unfinalized stream files (no EOF marker).
             # The writer adds \n after content for format correctness. In finalized
             # files, the EOF marker stops accumulation before this padding, so
@@ -217,44 +274,72 @@ class PFMReader:
     def open(cls, path: str | Path, max_size: int = MAX_FILE_SIZE) -> PFMReaderHandle:
         """Open a .pfm file for indexed, lazy reading.
 
-        Only reads the header (magic + meta + index) on open.
-        Section content is read on demand via file seek — the full file
-        is never loaded into memory.
+        The file is memory-mapped read-only. Only the header (magic + meta
+        + index) is parsed on open; section content is sliced out of the
+        mapping on demand, so the OS pages in just the sections you read.
+
+        Raises BadMagicError (a ValueError) if the file does not start
+        with the PFM magic bytes.
 
         CRLF safety: If the file contains ``\\r\\n`` line endings (e.g. from
         Git autocrlf on Windows), the reader transparently normalizes the
         data to LF-only so that index byte offsets remain correct.
         """
-        path = Path(path)
-        file_size = path.stat().st_size
-        if file_size > max_size:
-            raise ValueError(
-                f"File size {file_size} exceeds maximum {max_size} bytes. "
-                f"Pass max_size= to override."
-            )
-
-        f = builtins_open(path, "rb")
+        magic = _MAGIC_BYTES
+        # The mapping stays valid after the file object is closed
+        with builtins_open(path, "rb") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size > max_size:
+                raise ValueError(
+                    f"File size {file_size} exceeds maximum {max_size} bytes. "
+                    f"Pass max_size= to override."
+                )
+            if file_size < len(magic):
+                raise BadMagicError("Not a PFM file (bad magic bytes)")
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if mapped[:len(magic)] != magic:
+            mapped.close()
+            raise BadMagicError("Not a PFM file (bad magic bytes)")
+
+        handle: BinaryIO | mmap.mmap = mapped
         # Detect CRLF: peek at first 4 KB to check for \r\n
-        head = f.read(min(file_size, 4096))
-        has_crlf = b"\r\n" in head
-
-        if has_crlf:
+        if b"\r\n" in mapped[:4096]:
             # Normalize entire file to LF in memory so index offsets work
-            f.seek(0)
-            raw = f.read()
-            f.close()
-            normalized = raw.replace(b"\r\n", b"\n")
-            import io as _io
-            f = _io.BytesIO(normalized)
+            normalized = mapped[:].replace(b"\r\n", b"\n")
+            mapped.close()
+            handle = io.BytesIO(normalized)
             file_size = len(normalized)
 
-        else:
-            f.seek(0)
-
-        reader = PFMReaderHandle(f, file_size)
-        reader._parse_header()
+        reader = PFMReaderHandle(handle, file_size)
+        try:
+            reader._parse_header()
+        except BaseException:
+            reader.close()
+            raise
         return reader
 
+    @classmethod
+    def open_and_validate(
+        cls, path: str | Path, max_size: int = MAX_FILE_SIZE
+    ) -> tuple[PFMReaderHandle, bool]:
+        """Open a .pfm file and validate its checksum in one pass.
+
+        The magic bytes, the header and every section hashed by
+        validate_checksum() are all read from the single read-only mapping
+        made by open().
+
+        Returns (reader, checksum_valid). The caller must close the reader.
+        Raises BadMagicError (a ValueError) if the magic bytes are wrong,
+        and ValueError if the file is too large.
+        """
+        reader = cls.open(path, max_size)
+        try:
+            return reader, reader.validate_checksum()
+        except BaseException:
+            reader.close()
+            raise
+
 
 # Keep builtins reference so 'open' classmethod doesn't shadow
 builtins_open = builtins.open
@@ -265,16 +350,21 @@ class PFMReaderHandle:
     Handle for indexed, lazy access to a .pfm file.
 
     Only the header (magic, meta, index) is parsed on open.
-    Section content is read on demand via file seek — O(1) per section,
-    with no upfront cost proportional to file size.
+    Section content is read on demand — O(1) per section, with no upfront
+    cost proportional to file size. A memory-mapped handle is sliced
+    directly; any other binary file object is read via seek.
     """
 
-    def __init__(self, handle: BinaryIO, file_size: int) -> None:
+    def __init__(self, handle: BinaryIO | mmap.mmap, file_size: int) -> None:
         self._handle = handle
         self._file_size = file_size
+        self._mapped = isinstance(handle, mmap.mmap)
         self.meta: dict[str, str] = {}
         self.index: PFMIndex = PFMIndex()
         self.format_version: str = ""
+        # (offset, length) -> unescaped content, most recently used last.
+        # The file is never modified through the handle, so entries stay valid.
+        self._section_cache: OrderedDict[tuple[int, int], str] = OrderedDict()
 
     def _parse_header(self) -> None:
         """Parse only magic, meta, and index by reading line-by-line.
@@ -343,38 +433,68 @@ class PFMReaderHandle:
     def _parse_trailing_index(self) -> None:
         """Parse trailing index from the end of a stream-mode file.
 
-        Reads backward from EOF to find the index-trailing section.
+        Finds the last index-trailing header in the file's tail with one
+        rfind and parses only the lines after it, in file order.
         """
         # Read the tail of the file (trailing index is typically < 4KB)
         tail_size = min(self._file_size, 64 * 1024)
-        self._handle.seek(self._file_size - tail_size)
-        tail = self._handle.read(tail_size).decode("utf-8")
-        lines = tail.split("\n")
-
-        for line in reversed(lines):
-            if line.startswith(EOF_MARKER):
-                continue
-            if line.startswith(f"{SECTION_PREFIX}index-trailing"):
-                break  # Found the start of trailing index, we're done
-            if line.strip() == "":
+        tail = self._read_raw(self._file_size - tail_size, tail_size)
+
+        # Nothing is decoded except the section names and checksum taken
+        # from index lines, so a tail that starts mid-way through a
+        # multi-byte character is harmless.
+        header = tail.rfind(b"\n" + _TRAILING_INDEX_HEADER)
+        if header != -1:
+            header += 1
+        elif not tail.startswith(_TRAILING_INDEX_HEADER):
+            header = None  # No header in the tail: scan all of it
+        if header is not None:
+            body_start = tail.find(b"\n", header) + 1
+            tail = tail[body_start:] if body_start else b""
+
+        checksum = None
+        for line in tail.split(b"\n"):
+            if line.startswith(_EOF_MARKER_BYTES):
                 continue
-            parts = line.strip().split()
-            if len(parts) == 3 and parts[0] != "checksum":
+            parts = line.split()
+            if len(parts) == 3 and parts[0] != b"checksum":
                 try:
-                    name, offset, length = parts[0], int(parts[1]), int(parts[2])
+                    name, offset, length = parts[0].decode("utf-8"), int(parts[1]), int(parts[2])
                     # PFM-008: Validate bounds
                     if 0 <= offset and offset + length <= self._file_size:
                         self.index.add(name, offset, length)
                 except ValueError:
                     continue
-            elif len(parts) == 2 and parts[0] == "checksum":
-                self.meta["checksum"] = parts[1]
+            elif len(parts) == 2 and parts[0] == b"checksum" and checksum is None:
+                checksum = parts[1].decode("utf-8")  # First-wins
+        if checksum is not None:
+            self.meta["checksum"] = checksum
 
     def _read_raw(self, offset: int, length: int) -> bytes:
-        """Seek to offset and read exactly length bytes."""
+        """Read exactly length bytes at offset."""
+        if self._mapped:
+            return self._handle[offset:offset + length]
         self._handle.seek(offset)
         return self._handle.read(length)
 
+    def _read_content(self, offset: int, length: int) -> str:
+        """Read, decode and unescape one section, caching the result."""
+        key = (offset, length)
+        cache = self._section_cache
+        content = cache.get(key)
+        if content is not None:
+            cache.move_to_end(key)
+            return content
+        raw = self._read_raw(offset, length)
+        # Strip trailing newline that writer adds for format correctness
+        if raw.endswith(b"\n"):
+            raw = raw[:-1]
+        content = unescape_content(raw.decode("utf-8"))
+        cache[key] = content
+        if len(cache) > _SECTION_CACHE_SIZE:
+            cache.popitem(last=False)
+        return content
+
     def get_section(self, name: str) -> str | None:
         """O(1) indexed access to a section's content.
 
@@ -382,25 +502,30 @@ class PFMReaderHandle:
         requested section — no other data is loaded.
         """
         entry = self.index.get(name)
+        if entry is None:
+            return None
+        return self._read_content(*entry)
+
+    def get_section_bytes(self, name: str) -> bytes | None:
+        """Like get_section(), but returns the UTF-8 payload as bytes.
+
+        Content with no escaped marker lines (the common case) is returned
+        exactly as stored, skipping the decode/encode round trip.
+        """
+        entry = self.index.get(name)
         if entry is None:
             return None
         offset, length = entry
-        raw = self._read_raw(offset, length).decode("utf-8")
-        # Strip trailing newline that writer adds for format correctness
-        if raw.endswith("\n"):
+        raw = self._read_raw(offset, length)
+        if raw.endswith(b"\n"):
             raw = raw[:-1]
-        return unescape_content(raw)
+        if b"\\#" not in raw:
+            return raw
+        return unescape_content(raw.decode("utf-8")).encode("utf-8")
 
     def get_sections(self, name: str) -> list[str]:
         """Get all sections with the given name."""
-        results = []
-        for offset, length in self.index.get_all(name):
-            raw = self._read_raw(offset, length).decode("utf-8")
-            # Strip trailing newline that writer adds for format correctness
-            if raw.endswith("\n"):
-                raw = raw[:-1]
-            results.append(unescape_content(raw))
-        return results
+        return [self._read_content(off, ln) for off, ln in self.index.get_all(name)]
 
     @property
     def section_names(self) -> list[str]:
@@ -408,6 +533,8 @@ class PFMReaderHandle:
 
     def to_document(self) -> PFMDocument:
         """Convert to full PFMDocument (reads all sections from disk)."""
+        if self._mapped:
+            return PFMReader.parse(self._handle[:])
         self._handle.seek(0)
         data = self._handle.read()
         return PFMReader.parse(data)
@@ -416,7 +543,8 @@ class PFMReaderHandle:
         """Validate the checksum in meta against actual content.
 
         PFM-005 fix: Returns False if no checksum is present (fail-closed).
-        Reads each section via seek — does not load the full file.
+        Reads one section at a time — does not load the full file; a mapped
+        file is hashed in place without copying section bytes.
         """
         expected = self.meta.get("checksum", "")
         if not expected:
@@ -426,24 +554,44 @@ class PFMReaderHandle:
         # (without trailing newline), matching PFMDocument.compute_checksum().
         # Sort by offset to ensure consistent order regardless of how
         # the index was parsed (trailing index reads in reverse).
-        all_entries = []
-        for name in self.index.section_names:
-            for offset, length in self.index.get_all(name):
-                all_entries.append((offset, length))
-        all_entries.sort()
+        all_entries = sorted(
+            entry for entries in self.index.entries.values() for entry in entries
+        )
 
         h = hashlib.sha256()
+        update = h.update
+        if self._mapped:
+            # Hash straight out of the mapping: sections with no marker
+            # lines are passed to sha256 as zero-copy memoryview slices.
+            mapped = self._handle
+            find = mapped.find
+            with memoryview(mapped) as view:
+                for offset, length in all_entries:
+                    end = offset + length
+                    # Strip the trailing newline that the writer appends
+                    if length and mapped[end - 1] == 0x0A:
+                        end -= 1
+                    if find(b"\\#", offset, end) == -1:
+                        update(view[offset:end])
+                    else:
+                        update(unescape_content(mapped[offset:end].decode("utf-8")).encode("utf-8"))
+            return _hmac.compare_digest(h.hexdigest(), expected)
+
+        read_raw = self._read_raw
         for offset, length in all_entries:
-            chunk = self._read_raw(offset, length)
+            chunk = read_raw(offset, length)
             # Strip the trailing newline that the writer appends
             if chunk.endswith(b"\n"):
                 chunk = chunk[:-1]
-            # Unescape before checksumming (checksum covers original content)
-            unescaped = unescape_content(chunk.decode("utf-8")).encode("utf-8")
-            h.update(unescaped)
+            # Unescape before checksumming (checksum covers original content).
+            # Chunks with no escaped lines hash as stored, like get_section_bytes().
+            if b"\\#" in chunk:
+                chunk = unescape_content(chunk.decode("utf-8")).encode("utf-8")
+            update(chunk)
         return _hmac.compare_digest(h.hexdigest(), expected)
 
     def close(self) -> None:
+        self._section_cache.clear()
         self._handle.close()
 
     def __enter__(self) -> PFMReaderHandle:
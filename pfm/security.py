@@ -11,10 +11,13 @@ Security features:
 
 from __future__ import annotations
 
+import atexit
 import hashlib
 import hmac
 import os
 import struct
+import threading
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -23,6 +26,9 @@ if TYPE_CHECKING:
 # AAD (Additional Authenticated Data) for AES-GCM binding
 _AES_AAD = b"PFM-ENC/1.0"
 
+# 4-byte big-endian length prefix for each signed field
+_LENGTH_PREFIX = struct.Struct(">I")
+
 
 # =============================================================================
 # HMAC Signing & Verification
@@ -42,14 +48,7 @@ def sign(doc: PFMDocument, secret: str | bytes) -> str:
 
     # Build the message to sign, excluding any existing sig fields
     # so that sign() and verify() always use the same message.
-    import copy as _copy
-    doc_copy = _copy.copy(doc)
-    doc_copy.custom_meta = {
-        k: v for k, v in doc.custom_meta.items()
-        if k not in ("signature", "sig_algo")
-    }
-    message = _build_signing_message(doc_copy)
-    signature = hmac.new(secret, message, hashlib.sha256).hexdigest()
+    signature = _compute_signature(doc, secret)
 
     doc.custom_meta["signature"] = signature
     doc.custom_meta["sig_algo"] = "hmac-sha256"
@@ -77,21 +76,23 @@ def verify(doc: PFMDocument, secret: str | bytes, *, require: bool = False) -> b
     if isinstance(secret, str):
         secret = secret.encode("utf-8")
 
-    # Thread-safe: build signing message from a snapshot that excludes
-    # signature/sig_algo, without ever touching the original dict.
-    from pfm.document import PFMDocument as _Doc
-    import copy as _copy
-    doc_copy = _copy.copy(doc)
-    doc_copy.custom_meta = {
-        k: v for k, v in doc.custom_meta.items()
-        if k not in ("signature", "sig_algo")
-    }
-    message = _build_signing_message(doc_copy)
-    expected = hmac.new(secret, message, hashlib.sha256).hexdigest()
+    # Thread-safe: the signing message is built from a snapshot that
+    # excludes signature/sig_algo, without ever touching the original dict.
+    expected = _compute_signature(doc, secret)
 
     return hmac.compare_digest(stored_sig, expected)
 
 
+def _compute_signature(doc: PFMDocument, secret: bytes) -> str:
+    """HMAC-SHA256 hex signature over the document, ignoring sig fields.
+
+    Uses the one-shot hmac.digest(), which runs OpenSSL's HMAC in a single
+    C call over the whole message with the GIL released.
+    """
+    message = _build_signing_message(doc)
+    return hmac.digest(secret, message, "sha256").hex()
+
+
 def _build_signing_message(doc: PFMDocument) -> bytes:
     """
     Build the canonical message bytes for signing.
@@ -99,42 +100,71 @@ def _build_signing_message(doc: PFMDocument) -> bytes:
     Uses length-prefixed encoding to prevent delimiter confusion (PFM-011 fix).
     Each field is: 4-byte big-endian length + raw bytes.
     Section ordering is preserved in the signature (PFM-016 fix).
+    The signature/sig_algo meta fields are never part of the message.
     """
-    buf = bytearray()
-
-    def _append(data: bytes) -> None:
-        buf.extend(struct.pack(">I", len(data)))
-        buf.extend(data)
-
     # Include format version
-    _append(doc.format_version.encode("utf-8"))
+    fields = [doc.format_version.encode("utf-8")]
 
-    # Include meta fields in deterministic order
+    # Include meta fields in deterministic order, excluding sig fields
     meta = doc.get_meta_dict()
-    for key in sorted(meta.keys()):
-        _append(f"{key}={meta[key]}".encode("utf-8"))
+    meta.pop("signature", None)
+    meta.pop("sig_algo", None)
+    fields += [f"{key}={meta[key]}".encode("utf-8") for key in sorted(meta)]
 
     # Include all section names and contents (order matters)
     for section in doc.sections:
-        _append(section.name.encode("utf-8"))
-        _append(section.content.encode("utf-8"))
+        fields.append(section.name.encode("utf-8"))
+        fields.append(section.encoded())
 
-    return bytes(buf)
+    # One join over prefix/field pairs; no per-field buffer growth
+    pack_length = _LENGTH_PREFIX.pack
+    parts: list[bytes] = []
+    append = parts.append
+    for field in fields:
+        append(pack_length(len(field)))
+        append(field)
+    return b"".join(parts)
 
 
 # =============================================================================
 # AES-256-GCM Encryption
 # =============================================================================
 
+# Small in-process LRU of derived keys: (SHA-256 of password, salt) -> key.
+# Decrypting the same file repeatedly in one process (a server, a batch
+# script driving the API) pays for PBKDF2 once. Encryption always draws a
+# fresh salt, so it never hits. Cleared at interpreter exit. All access
+# holds _key_cache_lock (web and TUI callers derive keys from threads);
+# PBKDF2 itself runs outside the lock.
+_KEY_CACHE_SIZE = 8
+_key_cache: OrderedDict[tuple[bytes, bytes], bytes] = OrderedDict()
+_key_cache_lock = threading.Lock()
+atexit.register(_key_cache.clear)
+
+
 def _derive_key(password: str, salt: bytes) -> bytes:
     """Derive a 256-bit key from a password using PBKDF2."""
-    return hashlib.pbkdf2_hmac(
+    password_bytes = password.encode("utf-8")
+    cache_key = (hashlib.sha256(password_bytes).digest(), bytes(salt))
+    with _key_cache_lock:
+        key = _key_cache.get(cache_key)
+        if key is not None:
+            _key_cache.move_to_end(cache_key)
+            return key
+
+    key = hashlib.pbkdf2_hmac(
         "sha256",
-        password.encode("utf-8"),
+        password_bytes,
         salt,
         iterations=600_000,  # OWASP recommended minimum
         dklen=32,
     )
+    with _key_cache_lock:
+        _key_cache[cache_key] = key
+        _key_cache.move_to_end(cache_key)
+        while len(_key_cache) > _KEY_CACHE_SIZE:
+            _key_cache.popitem(last=False)
+    return key
 
 
 def encrypt_bytes(data: bytes, password: str) -> bytes:
@@ -219,7 +249,7 @@ def decrypt_document(data: bytes, password: str) -> "PFMDocument":
         raise ValueError("Malformed encrypted PFM file: missing header terminator")
 
     header_end = data.index(b"\n") + 1
-    encrypted = data[header_end:]
+    encrypted = memoryview(data)[header_end:]  # no copy of the payload
 
     # Minimum payload: 16 (salt) + 12 (nonce) + 16 (GCM tag) = 44 bytes
     if len(encrypted) < 44:
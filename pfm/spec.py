@@ -137,10 +137,23 @@ def unescape_content_line(line: str) -> str:
 
 
 def escape_content(content: str) -> str:
-    """Escape all lines in a content string."""
+    """Escape all lines in a content string.
+
+    Returns ``content`` itself (same object) when nothing needs escaping:
+    every escapable line contains "#@" or "#!".
+    """
+    if "#@" not in content and "#!" not in content:
+        return content
     return "\n".join(escape_content_line(line) for line in content.split("\n"))
 
 
 def unescape_content(content: str) -> str:
-    """Unescape all lines in a content string."""
+    """Unescape all lines in a content string.
+
+    Returns ``content`` itself when no line is escaped: every escaped line
+    has a backslash directly before its "#@"/"#!" marker, so one scan for
+    "\\#" rules them all out.
+    """
+    if "\\#" not in content:
+        return content
     return "\n".join(unescape_content_line(line) for line in content.split("\n"))
@@ -97,9 +97,11 @@ class PFMStreamWriter:
                     # Strip trailing newline (writer protocol)
                     if chunk.endswith(b"\n"):
                         chunk = chunk[:-1]
-                    # Unescape before checksumming (matches full reader behavior)
-                    unescaped = unescape_content(chunk.decode("utf-8"))
-                    self._checksum.update(unescaped.encode("utf-8"))
+                    # Unescape before checksumming (matches full reader behavior);
+                    # chunks with no escaped lines are hashed as stored
+                    if b"\\#" in chunk:
+                        chunk = unescape_content(chunk.decode("utf-8")).encode("utf-8")
+                    self._checksum.update(chunk)
             # Position at end, before any trailing index/EOF
             self._handle.seek(0, 2)
         else:
@@ -148,7 +150,7 @@ class PFMStreamWriter:
             raise ValueError(
                 f"Section name too long: {len(name)} chars (max {MAX_SECTION_NAME_LENGTH})"
             )
-        if not all(c in ALLOWED_SECTION_NAME_CHARS for c in name):
+        if not ALLOWED_SECTION_NAME_CHARS.issuperset(name):
             raise ValueError(
                 f"Invalid section name: {name!r}. "
                 f"Only lowercase alphanumeric, hyphens, and underscores allowed."
@@ -294,17 +296,14 @@ def _recover(path: Path) -> tuple:
     backup_path.write_bytes(raw)
 
     text = raw.decode("utf-8")
-    lines = text.split("\n")
 
     sections: list[tuple[str, int, int]] = []
     byte_pos = 0
 
-    i = 0
     current_section_name: str | None = None
     current_content_start: int = 0
 
-    while i < len(lines):
-        line = lines[i]
+    for line in text.split("\n"):
         line_bytes = len(line.encode("utf-8")) + 1  # +1 for newline
 
         # Only match unescaped section markers
@@ -321,7 +320,7 @@ def _recover(path: Path) -> tuple:
                 current_section_name = None
             elif (
                 len(section_tag) <= MAX_SECTION_NAME_LENGTH
-                and all(c in ALLOWED_SECTION_NAME_CHARS for c in section_tag)
+                and ALLOWED_SECTION_NAME_CHARS.issuperset(section_tag)
             ):
                 current_section_name = section_tag
                 current_content_start = byte_pos + line_bytes
@@ -336,7 +335,6 @@ def _recover(path: Path) -> tuple:
                 current_section_name = None
 
         byte_pos += line_bytes
-        i += 1
 
     # Flush last section if file was truncated (crash)
     if current_section_name is not None:
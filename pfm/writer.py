@@ -33,7 +33,10 @@ class PFMWriter:
             header_line = f"{SECTION_PREFIX}{section.name}\n".encode("utf-8")
             # Escape content lines that look like PFM markers
             escaped = escape_content(section.content)
-            content_bytes = escaped.encode("utf-8")
+            if escaped is section.content:
+                content_bytes = section.encoded()  # unchanged: reuse cached bytes
+            else:
+                content_bytes = escaped.encode("utf-8")
             # ALWAYS append exactly one newline as a format separator.
             # The reader ALWAYS strips exactly one trailing newline.
             # This preserves content that naturally ends with \n:
@@ -122,28 +125,44 @@ class PFMWriter:
         PFM-019 fix: Uses explicit file permissions (default 0644).
         For sensitive files, pass mode=0o600.
         """
-        import os
-        import tempfile
         data = PFMWriter.serialize(doc)
-        # Atomic write: write to temp file, then rename over target.
-        # This ensures the target file is never partially written.
-        dir_name = os.path.dirname(os.path.abspath(path)) or "."
-        fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".pfm.tmp")
-        try:
-            with os.fdopen(fd, 'wb') as f:
-                f.write(data)
-                f.flush()
-                os.fsync(f.fileno())
-            # On Windows, target must not exist for os.rename
-            if os.path.exists(path):
-                os.replace(tmp_path, path)
-            else:
-                os.rename(tmp_path, path)
-        except Exception:
-            # Clean up temp file on failure
-            try:
-                os.unlink(tmp_path)
-            except OSError:
-                pass
-            raise
+        atomic_write(path, data, suffix=".pfm.tmp")
         return len(data)
+
+
+def atomic_write(path: str, data: bytes, mode: int | None = None, suffix: str = ".tmp") -> None:
+    """Write bytes to ``path`` atomically.
+
+    Writes to a temp file in the target's directory, fsyncs it, then renames
+    it over the target, so the target is never left partially written.
+    The file is created 0600 (mkstemp) unless ``mode`` is given, in which
+    case the process umask is applied to it, as open()/write_bytes() would.
+    """
+    import os
+    import tempfile
+    if mode is not None:
+        # os.umask() can only be read by setting it; restore it at once
+        umask = os.umask(0o077)
+        os.umask(umask)
+        mode &= ~umask
+    dir_name = os.path.dirname(os.path.abspath(path)) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=suffix)
+    try:
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # On Windows, target must not exist for os.rename
+        if os.path.exists(path):
+            os.replace(tmp_path, path)
+        else:
+            os.rename(tmp_path, path)
+    except Exception:
+        # Clean up temp file on failure
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -80,6 +80,12 @@ class TestEscapeRoundTrip:
         unescaped = unescape_content(escaped)
         assert unescaped == content
 
+    def test_unescape_skips_content_without_escapes(self):
+        """Markers with no backslash before them leave content untouched."""
+        content = "mid-line #@marker\n#!other\ntrailing #!END"
+        assert unescape_content(content) is content
+        assert unescape_content("\\#@section\n\\#hello") == "#@section\n\\#hello"
+
     def test_no_false_positives(self):
         """Lines that should NOT be escaped remain untouched."""
         safe_lines = [
@@ -2,6 +2,7 @@
 End-to-End Tests - Full workflows from creation through conversion.
 """
 
+import os
 import subprocess
 import sys
 import tempfile
@@ -302,3 +303,211 @@ class TestCLI:
 
         Path(pfm_path).unlink()
         Path(json_path).unlink()
+
+    def test_cli_identify_non_pfm_and_missing(self):
+        project_root = str(Path(__file__).parent.parent)
+        with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as f:
+            f.write(b"plain text")
+            path = f.name
+
+        result = subprocess.run(
+            [sys.executable, "-m", "pfm.cli", "identify", path],
+            capture_output=True,
+            text=True,
+            cwd=project_root,
+        )
+        assert result.returncode == 1
+        assert "not PFM" in result.stdout
+
+        Path(path).unlink()
+
+        # Missing files are reported as not PFM rather than crashing
+        result = subprocess.run(
+            [sys.executable, "-m", "pfm.cli", "identify", path],
+            capture_output=True,
+            text=True,
+            cwd=project_root,
+        )
+        assert result.returncode == 1
+        assert "not PFM" in result.stdout
+        assert "Traceback" not in result.stderr
+
+    def test_cli_create_from_stdin(self, tmp_path):
+        project_root = str(Path(__file__).parent.parent)
+        path = str(tmp_path / "piped.pfm")
+        content = "piped caf\u00e9\n#@not a section\n"
+
+        result = subprocess.run(
+            [sys.executable, "-m", "pfm.cli", "create", "-o", path],
+            input=content.encode("utf-8"),
+            capture_output=True,
+            cwd=project_root,
+        )
+        assert result.returncode == 0, result.stderr
+        assert PFMReader.read(path).content == content
+
+        result = subprocess.run(
+            [sys.executable, "-m", "pfm.cli", "create", "-o", path],
+            input=b"\xff\xfe bad",
+            capture_output=True,
+            cwd=project_root,
+        )
+        assert result.returncode == 1
+        assert b"not valid UTF-8" in result.stderr
+
+    def test_cli_export_jsonl(self, tmp_path):
+        import json
+        project_root = str(Path(__file__).parent.parent)
+        for i in range(3):
+            doc = PFMDocument.create(agent="chat", model="m")
+            doc.add_section("chain", f"User: question {i}\n\nAssistant: answer {i}")
+            doc.write(str(tmp_path / f"chat{i}.pfm"))
+        output = tmp_path / "train.jsonl"
+
+        result = subprocess.run(
+            [sys.executable, "-m", "pfm.cli", "export", str(tmp_path),
+             "-o", str(output), "--format", "sharegpt"],
+            capture_output=True,
+            text=True,
+            cwd=project_root,
+        )
+        assert result.returncode == 0, result.stderr
+        assert "Exported 3 conversations (6 turns)" in result.stdout
+        lines = output.read_text(encoding="utf-8").split("\n")
+        assert lines[-1] == ""
+        records = [json.loads(line) for line in lines[:-1]]
+        assert [r["conversations"][0]["value"] for r in records] == [
+            f"question {i}" for i in range(3)
+        ]
+
+    def test_cli_create_signed(self, tmp_path):
+        project_root = str(Path(__file__).parent.parent)
+        path = str(tmp_path / "signed.pfm")
+
+        result = subprocess.run(
+            [sys.executable, "-m", "pfm.cli", "create",
+             "-o", path, "-c", "signed content", "--sign", "s3cret"],
+            capture_output=True,
+            text=True,
+            cwd=project_root,
+        )
+        assert result.returncode == 0, result.stderr
+        assert "Signed" in result.stdout
+
+        result = subprocess.run(
+            [sys.executable, "-m", "pfm.cli", "verify", path, "-s", "s3cret"],
+            capture_output=True,
+            text=True,
+            cwd=project_root,
+        )
+        assert result.returncode == 0
+        assert "OK" in result.stdout
+
+    def test_cli_create_encrypted_writes_no_plaintext(self, tmp_path):
+        pytest.importorskip("cryptography")
+        project_root = str(Path(__file__).parent.parent)
+        path = tmp_path / "secret.pfm"
+
+        result = subprocess.run(
+            [sys.executable, "-m", "pfm.cli", "create",
+             "-o", str(path), "-c", "top secret", "--encrypt", "pw"],
+            capture_output=True,
+            text=True,
+            cwd=project_root,
+        )
+        assert result.returncode == 0, result.stderr
+        assert not path.exists()
+        assert Path(str(path) + ".enc").read_bytes().startswith(b"#!PFM-ENC/")
+
+    def test_cli_commands_import_only_what_they_use(self, tmp_path):
+        """Short commands must not drag in unrelated pfm submodules."""
+        project_root = str(Path(__file__).parent.parent)
+        path = str(tmp_path / "lazy.pfm")
+        doc = PFMDocument.create(agent="lazy")
+        doc.add_section("content", "x")
+        doc.write(path)
+
+        probe = (
+            "import sys\n"
+            "from pfm import cli\n"
+            "try:\n"
+            "    cli.main(sys.argv[1:])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "loaded = sorted(m for m in sys.modules if m.startswith('pfm.') or m in ('argparse', 'pathlib'))\n"
+            "print(','.join(loaded), file=sys.stderr)\n"
+        )
+
+        def loaded_modules(*argv):
+            result = subprocess.run(
+                [sys.executable, "-c", probe, *argv],
+                capture_output=True,
+                text=True,
+                cwd=project_root,
+            )
+            return set(result.stderr.strip().splitlines()[-1].split(","))
+
+        identify = loaded_modules("identify", path)
+        assert "argparse" not in identify
+        assert "pathlib" not in identify
+        assert "pfm.reader" not in identify
+
+        version = loaded_modules("--version")
+        assert "argparse" not in version
+        assert "pathlib" not in version
+
+        read = loaded_modules("read", path, "content")
+        assert "pfm.reader" in read
+        for heavy in ("pfm.security", "pfm.converters", "pfm.export", "pfm.stream"):
+            assert heavy not in read
+
+    def test_cli_create_rejects_traversal_before_writing(self):
+        project_root = str(Path(__file__).parent.parent)
+        result = subprocess.run(
+            [sys.executable, "-m", "pfm.cli", "create",
+             "-o", "../escape.pfm", "-c", "x", "--sign", "k"],
+            capture_output=True,
+            text=True,
+            cwd=project_root,
+        )
+        assert result.returncode == 1
+        assert "path traversal" in result.stderr
+        assert "Traceback" not in result.stderr
+
+    def test_cli_create_file_rejects_symlink_escape(self, tmp_path):
+        outside = tmp_path / "outside.txt"
+        outside.write_text("secret")
+        work = tmp_path / "work"
+        work.mkdir()
+        (work / "link.txt").symlink_to(outside)
+        (work / "inside.txt").write_text("fine")
+        env = {**os.environ, "PYTHONPATH": str(Path(__file__).parent.parent)}
+
+        def create(src):
+            return subprocess.run(
+                [sys.executable, "-m", "pfm.cli", "create", "-f", src, "-o", "out.pfm"],
+                capture_output=True, text=True, cwd=str(work), env=env,
+            )
+
+        result = create("link.txt")
+        assert result.returncode == 1
+        assert "under the current directory" in result.stderr
+        assert create("inside.txt").returncode == 0
+        assert create(str(work / "inside.txt")).returncode == 0
+
+    def test_cli_view_html_rejects_traversal(self, tmp_path):
+        path = str(tmp_path / "view.pfm")
+        doc = PFMDocument.create(agent="cli-test")
+        doc.add_section("content", "x")
+        doc.write(path)
+        project_root = str(Path(__file__).parent.parent)
+        result = subprocess.run(
+            [sys.executable, "-m", "pfm.cli", "view", path,
+             "--html", "-o", "../escape.html"],
+            capture_output=True,
+            text=True,
+            cwd=project_root,
+        )
+        assert result.returncode == 1
+        assert "path traversal" in result.stderr
+        assert not (Path(project_root).parent / "escape.html").exists()
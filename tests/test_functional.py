@@ -3,6 +3,7 @@ Functional Tests - Test writer, reader, and converters working together.
 """
 
 import hashlib
+import os
 import tempfile
 from pathlib import Path
 
@@ -10,7 +11,7 @@ import pytest
 
 from pfm.document import PFMDocument
 from pfm.writer import PFMWriter
-from pfm.reader import PFMReader, PFMReaderHandle
+from pfm.reader import PFMReader, PFMReaderHandle, BadMagicError
 from pfm.spec import MAGIC, EOF_MARKER, SECTION_PREFIX
 from pfm import converters
 
@@ -75,6 +76,28 @@ class TestWriter:
         assert Path(path).stat().st_size == nbytes
         Path(path).unlink()
 
+    def test_atomic_write_replaces_target(self, tmp_path):
+        from pfm.writer import atomic_write
+
+        target = tmp_path / "out.json"
+        target.write_text("old contents that are longer")
+        old_umask = os.umask(0o022)
+        try:
+            atomic_write(str(target), b"new", mode=0o644)
+            assert target.read_bytes() == b"new"
+            assert target.stat().st_mode & 0o777 == 0o644
+
+            # A restrictive umask is honoured, like Path.write_bytes()
+            os.umask(0o077)
+            atomic_write(str(target), b"private", mode=0o644)
+            assert target.read_bytes() == b"private"
+            assert target.stat().st_mode & 0o777 == 0o600
+            assert os.umask(0o077) == 0o077  # left unchanged
+        finally:
+            os.umask(old_umask)
+        # No temp files left behind
+        assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
     def test_index_byte_offsets_are_correct(self):
         """Critical: verify that index byte offsets actually point to the right content."""
         doc = PFMDocument.create(agent="test")
@@ -143,6 +166,17 @@ class TestReader:
 
         assert doc.content == multiline
 
+    def test_parse_normalizes_crlf_and_cr(self):
+        data = self._make_pfm(content="café\nline 2", chain="😀 prompt")
+        for newline in (b"\r\n", b"\r"):
+            doc = PFMReader.parse(data.replace(b"\n", newline))
+            assert doc.agent == "test"
+            assert doc.content == "café\nline 2"
+            assert doc.chain == "😀 prompt"
+
+        with pytest.raises(UnicodeDecodeError):
+            PFMReader.parse(data.replace(b"hello", b"\xff") + b"\r\n\xff")
+
     def test_is_pfm_file(self):
         data = self._make_pfm()
         with tempfile.NamedTemporaryFile(suffix=".pfm", delete=False) as f:
@@ -224,6 +258,139 @@ class TestReaderHandle:
 
         Path(path).unlink()
 
+    def test_validate_checksum_with_escaped_sections(self, tmp_path):
+        doc = PFMDocument.create()
+        doc.add_section("content", "plain")
+        doc.add_section("chain", "#@fake\n#!PFM/1.0\nok")
+        doc.add_section("tools", "")
+        path = str(tmp_path / "esc.pfm")
+        doc.write(path)
+
+        with PFMReader.open(path) as reader:
+            assert reader.validate_checksum()
+
+        # CRLF copies are read through BytesIO rather than the mapping
+        crlf = tmp_path / "esc_crlf.pfm"
+        crlf.write_bytes(Path(path).read_bytes().replace(b"\n", b"\r\n"))
+        with PFMReader.open(crlf) as reader:
+            assert reader.validate_checksum()
+
+    def test_get_section_bytes(self, tmp_path):
+        doc = PFMDocument.create()
+        doc.add_section("content", "plain caf\u00e9\n")
+        doc.add_section("chain", "line\n#@fake marker\n\\#!also")
+        path = tmp_path / "bytes.pfm"
+        doc.write(str(path))
+
+        with PFMReader.open(path) as reader:
+            for name in ("content", "chain"):
+                assert reader.get_section_bytes(name) == reader.get_section(name).encode("utf-8")
+            assert reader.get_section_bytes("missing") is None
+
+    def test_section_reads_are_cached_per_handle(self, tmp_path, monkeypatch):
+        from pfm import reader as reader_mod
+
+        monkeypatch.setattr(reader_mod, "_SECTION_CACHE_SIZE", 2)
+        doc = PFMDocument.create()
+        for name in ("content", "chain", "tools"):
+            doc.add_section(name, f"{name} \\#@body")
+        path = tmp_path / "cached.pfm"
+        doc.write(str(path))
+
+        with PFMReader.open(path) as reader:
+            first = reader.get_section("content")
+            assert first == "content \\#@body"
+            assert reader.get_section("content") is first
+            assert reader.get_sections("content") == [first]
+            reader.get_section("chain")
+            reader.get_section("tools")
+            assert len(reader._section_cache) == 2
+            assert reader.get_section("content") == first
+
+    def test_open_and_validate(self, tmp_path):
+        doc = PFMDocument.create(agent="fused")
+        doc.add_section("content", "validated in one pass")
+        doc.add_section("chain", "#@looks like a marker")
+        path = tmp_path / "fused.pfm"
+        doc.write(str(path))
+
+        reader, valid = PFMReader.open_and_validate(path)
+        with reader:
+            assert valid
+            assert reader.meta["agent"] == "fused"
+            assert reader.get_section("chain") == "#@looks like a marker"
+
+        # Tampered content fails validation
+        path.write_bytes(path.read_bytes().replace(b"one pass", b"two pass"))
+        reader, valid = PFMReader.open_and_validate(path)
+        with reader:
+            assert not valid
+
+    def test_open_and_validate_rejects_bad_magic(self, tmp_path):
+        path = tmp_path / "not.pfm"
+        path.write_bytes(b"hello world")
+        with pytest.raises(ValueError, match="magic"):
+            PFMReader.open_and_validate(path)
+        path.write_bytes(b"")
+        with pytest.raises(BadMagicError):
+            PFMReader.open_and_validate(path)
+
+    def test_open_enforces_size_limit(self, tmp_path):
+        path = tmp_path / "big.pfm"
+        path.write_bytes(b"#!PFM/1.0\n#@meta\n" + b"x" * 100)
+        with pytest.raises(ValueError, match="exceeds maximum"):
+            PFMReader.open(path, max_size=50)
+
+    def test_open_maps_file_and_slices_sections(self, tmp_path):
+        import mmap
+
+        doc = PFMDocument.create(agent="mapped")
+        doc.add_section("content", "first\n#@not a marker")
+        doc.add_section("chain", "second")
+        path = tmp_path / "mapped.pfm"
+        path.write_bytes(PFMWriter.serialize(doc))
+
+        reader = PFMReader.open(path)
+        with reader:
+            assert isinstance(reader._handle, mmap.mmap)
+            assert reader.get_section("content") == "first\n#@not a marker"
+            assert reader.get_section_bytes("chain") == b"second"
+            assert reader.validate_checksum()
+            assert reader.to_document().content == "first\n#@not a marker"
+        assert reader._handle.closed
+
+        # CRLF files are normalized in memory instead of mapped
+        path.write_bytes(path.read_bytes().replace(b"\n", b"\r\n"))
+        with PFMReader.open(path) as reader:
+            assert not isinstance(reader._handle, mmap.mmap)
+            assert reader.get_section("chain") == "second"
+
+    def test_open_closes_file_when_header_is_rejected(self, tmp_path, monkeypatch):
+        from pfm import reader as reader_mod
+
+        opened = []
+
+        def tracking_open(*args, **kwargs):
+            f = open(*args, **kwargs)
+            opened.append(f)
+            return f
+
+        monkeypatch.setattr(reader_mod, "builtins_open", tracking_open)
+        path = tmp_path / "future.pfm"
+        path.write_bytes(b"#!PFM/9.9\n#@meta\nid: x\n")
+        with pytest.raises(ValueError, match="Unsupported PFM format version"):
+            PFMReader.open(path)
+        assert opened and all(f.closed for f in opened)
+
+    def test_open_rejects_bad_magic(self, tmp_path):
+        path = tmp_path / "not.pfm"
+        path.write_bytes(b"#@meta\nid: x\n")
+        with pytest.raises(BadMagicError):
+            PFMReader.open(path)
+        # Still a ValueError for existing callers
+        with pytest.raises(ValueError):
+            PFMReader.open(path)
+
     def test_to_document(self):
         doc = PFMDocument.create(agent="convert-test")
         doc.add_section("content", "convert me")
@@ -265,6 +432,42 @@ class TestConverters:
         assert loaded.content == "converter test content"
         assert loaded.chain == "user: hello\nagent: hi"
 
+    def test_json_output_matches_stdlib_formatting(self):
+        import json
+        doc = self._make_doc()
+        doc.add_section("notes", "caf\u00e9 \u2028 \x00 \"quoted\"")
+        out = converters.to_json(doc)
+        assert out == json.dumps(json.loads(out), indent=2, ensure_ascii=False)
+
+    def test_json_roundtrip_with_lone_surrogate(self):
+        import json
+        src = '{"pfm_version": "1.0", "meta": {"agent": "a"}, "sections": [{"name": "content", "content": "x\\ud800y"}]}'
+        doc = converters.from_json(src)
+        assert doc.content == "x\ud800y"
+
+        out = converters.to_json(doc)
+        assert out == json.dumps(json.loads(out), indent=2, ensure_ascii=False)
+        assert converters.from_json(out).content == "x\ud800y"
+        with pytest.raises(UnicodeEncodeError):
+            converters.to_json_bytes(doc)
+
+    def test_json_from_accepts_stdlib_only_values(self):
+        doc = converters.from_json('{"big": 123456789012345678901234567890, "n": NaN}')
+        assert "123456789012345678901234567890" in doc.content
+
+    def test_convert_to_bytes_matches_text(self):
+        doc = self._make_doc()
+        for fmt in ("json", "csv", "txt", "md"):
+            assert converters.convert_to_bytes(doc, fmt) == converters.convert_to(doc, fmt).encode("utf-8")
+
+    def test_json_from_bytes(self):
+        doc = self._make_doc()
+        data = converters.to_json(doc)
+        from_str = converters.convert_from(data, "json")
+        from_bytes = converters.convert_from(bytearray(data.encode("utf-8")), "json")
+        assert from_bytes.sections == from_str.sections
+        assert from_bytes.agent == "conv-test"
+
     def test_json_structure(self):
         import json
         doc = self._make_doc()
@@ -286,6 +489,33 @@ class TestConverters:
         assert loaded.agent == "conv-test"
         assert loaded.content == "converter test content"
 
+    def test_csv_matches_csv_writer(self):
+        import csv
+        import io
+        doc = PFMDocument.create(agent='a,"b"', model="=cmd")
+        doc.custom_meta["note"] = "line1\r\nline2"
+        doc.add_section("content", 'has "quotes", commas\nand newlines')
+        doc.add_section("chain", " -leading space formula")
+        doc.add_section("tools", "")
+
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(["type", "key", "value"])
+        for key, val in doc.get_meta_dict().items():
+            writer.writerow(["meta", converters._escape_csv_formula(key), converters._escape_csv_formula(val)])
+        for section in doc.sections:
+            writer.writerow(["section", section.name, converters._escape_csv_formula(section.content)])
+        assert converters.to_csv(doc) == buf.getvalue()
+
+    def test_csv_formula_escaping(self):
+        esc = converters._escape_csv_formula
+        assert esc("") == ""
+        assert esc("plain") == "plain"
+        assert esc("=SUM(A1)") == "'=SUM(A1)"
+        assert esc("  +1") == "'  +1"
+        assert esc("\n@cmd") == "'\n@cmd"
+        assert esc("\t") == "\t"  # whitespace only: nothing to escape
+
     def test_csv_has_header(self):
         doc = self._make_doc()
         csv_str = converters.to_csv(doc)
@@ -325,6 +555,33 @@ class TestConverters:
         assert md.startswith("---\n")
         assert "agent: conv-test" in md
 
+    def test_markdown_frontmatter_key_sanitized(self):
+        doc = PFMDocument.create()
+        doc.custom_meta["bad key: x"] = "v"
+        doc.custom_meta["caf\u00e9-ok_1"] = "line\n---"
+        md = converters.to_markdown(doc)
+        assert "bad_key__x: v\n" in md
+        assert "caf\u00e9-ok_1: line \\---\n" in md
+
+    def test_markdown_exact_layout(self):
+        doc = PFMDocument(agent="a")
+        doc.add_section("content", "one")
+        doc.add_section("chain", "two\n")
+        assert converters.to_markdown(doc) == (
+            "---\nagent: a\n---\n\n## content\n\none\n\n## chain\n\ntwo\n\n"
+        )
+        bare = PFMDocument()
+        bare.add_section("content", "x")
+        assert converters.to_markdown(bare) == "## content\n\nx\n"
+
+    def test_markdown_from_header_and_frontmatter_parsing(self):
+        md = "---\nagent: a: b\nnote:x\n---\n## My Section! (v2)\nbody\n## ???\nrest\n"
+        doc = converters.from_markdown(md)
+        assert doc.agent == "a: b"
+        assert "note:x" not in doc.custom_meta
+        assert doc.get_section("my-section-v2").content == "body"
+        assert doc.get_section("content").content == "rest"
+
     def test_markdown_from_plain(self):
         doc = converters.from_markdown("# Hello\nJust some markdown without headers")
         assert doc.content is not None
@@ -339,3 +596,133 @@ class TestConverters:
     def test_convert_from_unknown_format(self):
         with pytest.raises(ValueError, match="Unknown format"):
             converters.convert_from("data", "xml")
+
+
+# ================================================================
+# Export
+# ================================================================
+
+class TestExport:
+
+    def test_export_records_picks_first_chain_then_content(self):
+        from pfm.export import export_records
+
+        doc = PFMDocument.create()
+        doc.add_section("content", "fallback")
+        doc.add_section("chain", "User: first\n\nAssistant: one")
+        doc.add_section("chain", "User: second\n\nAssistant: two")
+        records, turns = export_records(doc, "alpaca")
+        assert turns == 1
+        assert records[0]["instruction"] == "first"
+
+        # An empty first chain falls back to the first content section
+        doc = PFMDocument.create()
+        doc.add_section("chain", "")
+        doc.add_section("chain", "User: ignored\n\nAssistant: x")
+        doc.add_section("content", "answer")
+        doc.add_section("content", "later")
+        records, turns = export_records(doc, "openai")
+        assert turns == 1
+        assert records[0]["messages"][-1] == {"role": "assistant", "content": "answer"}
+
+    def test_export_document_with_lone_surrogate(self):
+        import json
+        from pfm.export import export_document
+
+        doc = PFMDocument.create()
+        doc.add_section("chain", "User: x\ud800\n\nAssistant: ok")
+        lines, turns = export_document(doc, "sharegpt")
+        assert turns == 2
+        assert lines == [json.dumps(json.loads(lines[0]), ensure_ascii=False, separators=(",", ":"))]
+        assert json.loads(lines[0])["conversations"][0]["value"] == "x\ud800"
+
+    def test_load_documents_preserves_order_and_errors(self, tmp_path):
+        from pfm.export import load_documents
+
+        paths = []
+        for i in range(5):
+            doc = PFMDocument.create(agent=f"agent-{i}")
+            doc.add_section("content", f"doc {i}")
+            path = tmp_path / f"{i}.pfm"
+            doc.write(str(path))
+            paths.append(path)
+        bad = tmp_path / "missing.pfm"
+        paths.insert(2, bad)
+
+        results = load_documents(paths)
+        assert [p for p, _ in results] == paths
+        assert isinstance(results[2][1], Exception)
+        agents = [r.agent for _, r in results if not isinstance(r, Exception)]
+        assert agents == [f"agent-{i}" for i in range(5)]
+
+    def test_load_documents_process_pool(self, tmp_path, monkeypatch):
+        from pfm import export
+
+        monkeypatch.setattr(export, "_PROCESS_POOL_MIN_FILES", 2)
+        monkeypatch.setattr(export.os, "cpu_count", lambda: 2)
+        used = []
+        real_pool = export.ProcessPoolExecutor
+        monkeypatch.setattr(
+            export, "ProcessPoolExecutor", lambda: used.append(1) or real_pool(max_workers=2)
+        )
+        paths = []
+        for i in range(4):
+            doc = PFMDocument.create(agent=f"proc-{i}")
+            doc.add_section("content", f"doc {i}")
+            path = str(tmp_path / f"{i}.pfm")
+            doc.write(path)
+            paths.append(path)
+        paths.append(str(tmp_path / "missing.pfm"))
+
+        # Threads unless the caller opts in
+        assert [p for p, _ in export.load_documents(paths)] == paths
+        assert not used
+
+        results = export.load_documents(paths, processes=True)
+        assert [p for p, _ in results] == paths
+        assert [r.agent for _, r in results[:4]] == [f"proc-{i}" for i in range(4)]
+        assert isinstance(results[4][1], FileNotFoundError)
+        assert used
+
+    def test_write_jsonl_streams_one_record_per_line(self, tmp_path):
+        import io
+        import json
+        from pfm.export import export_documents, write_jsonl
+
+        docs = []
+        for i in range(3):
+            doc = PFMDocument.create(agent="exporter", model="m")
+            doc.add_section("chain", f"User: q{i} \u2028\U0001d11e\n\nAssistant: a{i}")
+            docs.append(doc)
+        out = tmp_path / "train.jsonl"
+
+        total = write_jsonl(docs, str(out), fmt="alpaca")
+        data = out.read_bytes()
+        assert total == 3
+        assert data.endswith(b"\n")
+        lines, _ = export_documents(docs, "alpaca")
+        assert data.decode("utf-8").split("\n")[:-1] == lines
+        for line in lines:
+            record = json.loads(line)
+            assert line == json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+        buf = io.BytesIO()
+        assert write_jsonl(docs, buf, fmt="alpaca") == 3
+        assert not buf.closed
+        assert buf.getvalue() == data
+
+    def test_load_pfm_paths(self, tmp_path):
+        from pfm.export import load_pfm_paths
+
+        for name in ("b.pfm", "a.pfm", "notes.txt"):
+            (tmp_path / name).write_text("x")
+        (tmp_path / "dir.pfm").mkdir()
+
+        assert load_pfm_paths(str(tmp_path)) == [
+            str(tmp_path / "a.pfm"),
+            str(tmp_path / "b.pfm"),
+        ]
+        single = str(tmp_path / "a.pfm")
+        assert load_pfm_paths(single) == [single]
+        with pytest.raises(FileNotFoundError):
+            load_pfm_paths(str(tmp_path / "missing"))
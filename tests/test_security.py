@@ -53,6 +53,19 @@ class TestSigning:
         doc.agent = "evil-agent"
         assert verify(doc, "key") is False
 
+    def test_verify_after_in_place_edits(self):
+        doc = PFMDocument.create(agent="test")
+        doc.add_section("content", "original")
+        sign(doc, "key")
+        assert verify(doc, "key") is True
+
+        # Same length, changed in place
+        doc.sections[0].content = "0riginal"
+        assert verify(doc, "key") is False
+        doc.sections[0].content = "original"
+        doc.custom_meta["note"] = "added"
+        assert verify(doc, "key") is False
+
     def test_verify_unsigned(self):
         doc = PFMDocument.create()
         doc.add_section("content", "unsigned")
@@ -174,6 +187,33 @@ class TestEncryption:
 
         Path(path).unlink()
 
+    def test_derived_key_is_cached_per_salt(self, monkeypatch):
+        import hashlib
+        from pfm import security
+
+        calls = []
+        real = hashlib.pbkdf2_hmac
+
+        def counting(*args, **kwargs):
+            calls.append(args)
+            return real(*args, **kwargs)
+
+        monkeypatch.setattr(security.hashlib, "pbkdf2_hmac", counting)
+        security._key_cache.clear()
+
+        encrypted = security.encrypt_bytes(b"cached", "pw")
+        assert security.decrypt_bytes(encrypted, "pw") == b"cached"
+        assert security.decrypt_bytes(encrypted, "pw") == b"cached"
+        assert len(calls) == 1  # encrypt derived it; both decrypts reused it
+
+        with pytest.raises(Exception):
+            security.decrypt_bytes(encrypted, "other")
+        assert len(calls) == 2
+
+        for _ in range(security._KEY_CACHE_SIZE + 2):
+            security.encrypt_bytes(b"x", "pw")
+        assert len(security._key_cache) == security._KEY_CACHE_SIZE
+
     def test_each_encryption_unique(self):
         """Same plaintext + password should produce different ciphertext (random salt/nonce)."""
         from pfm.security import encrypt_bytes
@@ -274,3 +314,34 @@ class TestDocumentValidateChecksum:
         doc = PFMDocument.create()
         doc.add_section("content", "no checksum")
         assert doc.validate_checksum() is False
+
+
+class TestDerivedKeyCache:
+
+    def test_concurrent_derivations_stay_bounded(self, monkeypatch):
+        import threading
+        from pfm import security
+
+        monkeypatch.setattr(
+            security.hashlib, "pbkdf2_hmac",
+            lambda name, pw, salt, iterations, dklen: (pw + salt).ljust(dklen, b"\0")[:dklen],
+        )
+        security._key_cache.clear()
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(300):
+                    salt = bytes([(n + i) % 16])
+                    assert security._derive_key("pw", salt) == (b"pw" + salt).ljust(32, b"\0")
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        assert len(security._key_cache) <= security._KEY_CACHE_SIZE
+        security._key_cache.clear()
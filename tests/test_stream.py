@@ -72,6 +72,34 @@ class TestStreamWriter:
 
         Path(path).unlink()
 
+    def test_stream_trailing_index_tail_splits_multibyte_char(self, tmp_path):
+        """The 64 KB tail read for the trailing index may begin mid-character."""
+        for n in (40_000, 40_001):  # one of these lands the tail on an odd byte
+            path = str(tmp_path / f"wide{n}.pfm")
+            with PFMStreamWriter(path, agent="wide") as w:
+                w.write_section("content", "\u00e9" * n)
+                w.write_section("tools", "tool_call()")
+
+            with PFMReader.open(path) as reader:
+                assert sorted(reader.section_names) == ["content", "tools"]
+                assert reader.get_section("content") == "\u00e9" * n
+                assert reader.validate_checksum()
+
+    def test_stream_index_keeps_file_order(self, tmp_path):
+        """Repeated names resolve to the first section, as in standard files."""
+        path = str(tmp_path / "dupes.pfm")
+        with PFMStreamWriter(path, agent="order") as w:
+            w.write_section("content", "first")
+            w.write_section("tools", "t")
+            w.write_section("content", "second")
+
+        with PFMReader.open(path) as reader:
+            assert reader.section_names == ["content", "tools"]
+            assert reader.get_section("content") == "first"
+            assert reader.get_sections("content") == ["first", "second"]
+            assert reader.validate_checksum()
+        assert PFMReader.read(path).content == "first"
+
     def test_stream_multiline_content(self):
         """Multiline content should survive streaming."""
         with tempfile.NamedTemporaryFile(suffix=".pfm", delete=False) as f:
@@ -237,6 +265,20 @@ class TestStreamChecksum:
 
         Path(path).unlink()
 
+    def test_stream_checksum_after_append_with_escaped_content(self, tmp_path):
+        """Recovery re-hashes existing sections, unescaping only where needed."""
+        path = str(tmp_path / "escaped.pfm")
+        with PFMStreamWriter(path, agent="escape-test") as w:
+            w.write_section("content", "plain")
+            w.write_section("chain", "#@looks like a header\n#!END")
+
+        with PFMStreamWriter(path, append=True) as w:
+            w.write_section("tools", "more")
+
+        with PFMReader.open(path) as reader:
+            assert reader.validate_checksum()
+        assert PFMReader.read(path).chain == "#@looks like a header\n#!END"
+
     def test_stream_checksum_detects_tampering(self):
         """Tampering with content should invalidate checksum."""
         with tempfile.NamedTemporaryFile(suffix=".pfm", delete=False) as f:
@@ -24,6 +24,14 @@ class TestPFMSection:
         assert s.offset == 0
         assert s.length == 0
 
+    def test_encoded_is_cached_until_content_changes(self):
+        s = PFMSection(name="content", content="h\u00e9llo")
+        first = s.encoded()
+        assert first == "h\u00e9llo".encode("utf-8")
+        assert s.encoded() is first
+        s.content = "tampered"
+        assert s.encoded() == b"tampered"
+
     def test_section_with_offset(self):
         s = PFMSection(name="chain", content="data", offset=100, length=4)
         assert s.offset == 100
@@ -74,6 +82,48 @@ class TestPFMDocument:
         results = doc.get_sections("artifacts")
         assert len(results) == 2
 
+    def test_get_section_tracks_section_list_changes(self):
+        doc = PFMDocument.create()
+        doc.add_section("content", "a")
+        assert doc.get_section("chain") is None
+        doc.add_section("chain", "b")
+        doc.add_section("content", "c")
+        assert doc.get_section("chain").content == "b"
+        assert [s.content for s in doc.get_sections("content")] == ["a", "c"]
+
+        doc.sections.pop(0)
+        assert doc.content == "c"
+        doc.sections[0].name = "tools"
+        assert doc.get_section("chain") is None
+        assert doc.get_section("tools").content == "b"
+        doc.sections = [PFMSection(name="chain", content="new")]
+        assert doc.chain == "new"
+        assert doc.content is None
+
+    def test_get_section_sees_in_place_list_edits(self):
+        doc = PFMDocument.create()
+        doc.add_section("chain", "first")
+        doc.add_section("content", "a")
+        assert doc.content == "a"
+
+        # insert ahead of existing sections
+        doc.sections.insert(0, PFMSection(name="content", content="inserted"))
+        doc.sections.insert(0, PFMSection(name="chain", content="zero"))
+        assert doc.content == "inserted"
+        assert [s.content for s in doc.get_sections("chain")] == ["zero", "first"]
+
+        # replace an item in place
+        doc.sections[1] = PFMSection(name="content", content="replaced")
+        assert doc.content == "replaced"
+
+        # pop + append keeps the length unchanged
+        doc.sections.pop()
+        doc.sections.pop()
+        doc.sections.append(PFMSection(name="content", content="x"))
+        doc.sections.append(PFMSection(name="tools", content="y"))
+        assert [s.content for s in doc.get_sections("content")] == ["replaced", "x"]
+        assert doc.get_section("tools").content == "y"
+
     def test_content_shortcut(self):
         doc = PFMDocument.create()
         doc.add_section("content", "the content")
@@ -109,6 +159,31 @@ class TestPFMDocument:
         assert "id" in meta
         assert "created" in meta
 
+    def test_add_section_bytes(self):
+        doc = PFMDocument.create()
+        raw = "caf\u00e9".encode("utf-8")
+        section = doc.add_section("content", raw)
+        assert section.content == "caf\u00e9"
+        assert section.encoded() == raw
+        assert doc.compute_checksum() == hashlib.sha256(raw).hexdigest()
+
+    def test_add_section_bytes_rejects_invalid_utf8(self):
+        doc = PFMDocument.create()
+        with pytest.raises(UnicodeDecodeError):
+            doc.add_section("content", b"\xff\xfe")
+
+    def test_add_section_from_file(self, tmp_path):
+        # Larger than one read chunk, with multi-byte characters
+        text = "caf\u00e9 \U0001F600\n" * 20_000
+        src = tmp_path / "input.txt"
+        src.write_bytes(text.encode("utf-8"))
+
+        doc = PFMDocument.create()
+        section = doc.add_section_from_file("content", src)
+        assert section.name == "content"
+        assert section.content == text
+        assert doc.content == text
+
     def test_repr(self):
         doc = PFMDocument.create(agent="test")
         doc.add_section("content", "x")
@@ -143,6 +218,40 @@ class TestSpec:
         assert "meta" in SECTION_TYPES
         assert "index" in SECTION_TYPES
 
+    def test_package_exports_resolve_lazily(self):
+        import pfm
+        from pfm.reader import PFMReader
+        from pfm.stream import PFMStreamWriter
+
+        assert pfm.PFMReader is PFMReader
+        assert pfm.PFMStreamWriter is PFMStreamWriter
+        assert pfm.PFMDocument is PFMDocument
+        assert "PFMWriter" in dir(pfm)
+        with pytest.raises(AttributeError):
+            pfm.NotAThing
+
+
+# =============================================================================
+# Reader index
+# =============================================================================
+
+class TestPFMIndex:
+
+    def test_section_names_cached_until_new_name(self):
+        from pfm.reader import PFMIndex
+
+        index = PFMIndex()
+        index.add("content", 10, 5)
+        names = index.section_names
+        assert names == ["content"]
+        assert index.section_names is names
+
+        index.add("content", 20, 5)  # duplicate name keeps the cache
+        assert index.section_names is names
+        index.add("chain", 30, 5)
+        assert index.section_names == ["content", "chain"]
+        assert index.get_all("content") == [(10, 5), (20, 5)]
+
 
 class TestSectionNameValidation:
     """Tests for section name charset enforcement."""
@@ -223,3 +332,87 @@ class TestVersionRejection:
         with pytest.raises(ValueError, match="exceeds maximum"):
             PFMReader.read(path, max_size=50)
         Path(path).unlink()
+
+
+class TestCLIParser:
+    """Tests for the per-command argument parser construction."""
+
+    @staticmethod
+    def _subcommands(parser):
+        import argparse
+        action = next(a for a in parser._actions if isinstance(a, argparse._SubParsersAction))
+        return set(action.choices)
+
+    def test_known_command_builds_only_its_subparser(self):
+        from pfm.cli import _get_parser
+        assert self._subcommands(_get_parser("read")) == {"read"}
+        assert self._subcommands(_get_parser("accio")) == {"accio"}
+
+    def test_unknown_command_builds_full_parser(self):
+        from pfm.cli import _COMMANDS, _get_parser
+        assert self._subcommands(_get_parser(None)) == set(_COMMANDS)
+
+    def test_every_command_builds_its_own_help(self, capsys):
+        from pfm.cli import _COMMANDS, _get_parser
+        for name in _COMMANDS:
+            with pytest.raises(SystemExit) as exc:
+                _get_parser(name).parse_args([name, "--help"])
+            assert exc.value.code == 0
+            assert f"usage: pfm {name}" in capsys.readouterr().out
+
+    def test_top_level_help_lists_every_command(self, capsys):
+        from pfm.cli import _COMMANDS, main
+        with pytest.raises(SystemExit):
+            main(["--help"])
+        out = capsys.readouterr().out
+        for name in _COMMANDS:
+            assert name in out
+
+    def test_parser_is_cached(self):
+        from pfm.cli import _get_parser
+        assert _get_parser("inspect") is _get_parser("inspect")
+        args = _get_parser("inspect").parse_args(["inspect", "a.pfm"])
+        assert args.command == "inspect" and args.path == "a.pfm"
+
+
+class TestCLISecretPrompt:
+    """Tests for the shared secret prompt used by encrypt/decrypt/sign/verify."""
+
+    def _fake_getpass(self, monkeypatch, answers):
+        from pfm import cli
+        answers = iter(answers)
+        monkeypatch.setattr(cli, "_read_secret", lambda prompt: next(answers))
+        monkeypatch.delenv("PFM_CONFIRM_PASSWORD", raising=False)
+
+    def test_confirm_mismatch_reprompts(self, monkeypatch):
+        from pfm.cli import _prompt_secret
+        self._fake_getpass(monkeypatch, ["pw", "typo", "pw", "pw"])
+        assert _prompt_secret("Password: ", confirm=True) == "pw"
+
+    def test_confirm_gives_up_after_three_mismatches(self, monkeypatch):
+        from pfm.cli import _prompt_secret
+        self._fake_getpass(monkeypatch, ["a", "b"] * 3)
+        with pytest.raises(SystemExit, match="do not match"):
+            _prompt_secret("Password: ", confirm=True)
+
+    def test_require_secret_rejects_empty(self, monkeypatch):
+        from pfm.cli import _require_secret
+        self._fake_getpass(monkeypatch, [""])
+        with pytest.raises(SystemExit, match="cannot be empty"):
+            _require_secret(None, "Secret")
+        assert _require_secret("given") == "given"
+
+
+class TestCLIInspect:
+    """Tests for the `pfm inspect` report."""
+
+    def test_long_meta_values_are_truncated(self, tmp_path, capsys):
+        from pfm.cli import main
+        doc = PFMDocument.create(agent="a" * 72, model="m" * 73)
+        doc.add_section("content", "x")
+        path = tmp_path / "t.pfm"
+        doc.write(str(path))
+        main(["inspect", str(path)])
+        out = capsys.readouterr().out
+        assert f"  agent: {'a' * 72}\n" in out
+        assert f"  model: {'m' * 69}...\n" in out